@@ -0,0 +1,58 @@
+"""
+Per-game setup cost of the LLM agents with fresh vs shared (pooled) provider clients.
+
+Every game builds a Codemaster and a Guesser, each with its own GPT manager.
+"fresh" gives every manager a new client (new connection pool, TLS handshake on
+its first request); "shared" reuses the process-wide clients from gpt_clients.py.
+
+Run from the repository root:
+    python -m codenames.benchmarks.client_setup --games 20
+    python -m codenames.benchmarks.client_setup --games 20 --request   # also time one real call per agent
+
+Without --request no API call is made (a dummy key is used if none is set).
+"""
+import argparse
+import os
+import statistics
+import time
+
+from codenames.players.gpt_manager import GPT
+
+
+def setup_game(provider, model, shared, request):
+    """Build the two managers of one game (and optionally send one request each); return seconds"""
+    start = time.perf_counter()
+    for role in ("Codemaster", "Guesser"):
+        manager = GPT(f"You are the {role}.", model, provider=provider, shared_client=shared)
+        if request:
+            manager.talk_to_ai("Reply with the single word OK.", max_retries=1)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--provider", default=os.getenv("LLM_PROVIDER", "openai").lower())
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--request", action="store_true", help="send one real request per agent")
+    args = parser.parse_args()
+
+    model = args.model or ("gemini-2.5-flash-lite" if args.provider == "gemini" else "gpt-4o-2024-05-13")
+    key_var = "GEMINI_API_KEY" if args.provider == "gemini" else "OPENAI_API_KEY"
+    if not os.getenv(key_var):
+        if args.request:
+            raise SystemExit(f"{key_var} must be set for --request")
+        os.environ[key_var] = "benchmark-dummy-key"
+    os.environ.pop("MOCK_GPT", None)
+
+    print(f"provider={args.provider} model={model} games={args.games} request={args.request}")
+    for label, shared in (("fresh clients (before)", False), ("shared clients (after)", True)):
+        times = [setup_game(args.provider, model, shared, args.request) for _ in range(args.games)]
+        print(
+            f"{label:24s} mean={statistics.mean(times) * 1000:8.2f} ms/game  "
+            f"median={statistics.median(times) * 1000:8.2f} ms  first={times[0] * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
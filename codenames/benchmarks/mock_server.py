@@ -0,0 +1,225 @@
+"""
+Local stand-in for the OpenAI chat-completions endpoint, for load and latency tests without network.
+
+Unlike MOCK_GPT=1 (which answers inside GPT.talk_to_ai), requests go through the real
+client stack: HTTP connection pool, retries on 429, timeouts, streaming and the rate limiter.
+
+    python -m codenames.benchmarks.mock_server --port 8011 --latency lognormal:0.4,0.5 --rate-limit-p 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8011/v1 OPENAI_API_KEY=local streamlit run ui_app.py
+
+Replies are board-aware by default (legal clues and guesses read back from the prompts, see
+players/gpt_mock.py); --script takes a JSON list of replies that are served in a cycle instead.
+GET /stats returns request, 429 and timeout counters.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from codenames.players.gpt_history import estimate_tokens
+from codenames.players.gpt_mock import LatencyProfile, mock_reply
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Args:
+        latency: LatencyProfile spec for the time to the (first byte of the) reply
+        rate_limit_p: probability of answering 429 instead
+        rpm: optional requests-per-minute quota; requests above it get 429 as well
+        timeout_p: probability of hanging for `hang_s` and then dropping the connection
+        script: list of replies served in a cycle instead of the board-aware mock
+        seed: seed for the injected faults and board-aware replies
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 8011), latency="0", rate_limit_p=0.0, rpm=None,
+                 timeout_p=0.0, hang_s=30.0, script=None, seed=0):
+        super().__init__(address, _Handler)
+        self.latency = LatencyProfile(latency)
+        self.rate_limit_p = float(rate_limit_p)
+        self.rpm = rpm
+        self.timeout_p = float(timeout_p)
+        self.hang_s = float(hang_s)
+        self.script = itertools.cycle(script) if script else None
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []   # request times of the last minute (rpm quota)
+        self.counters = {"requests": 0, "completed": 0, "rate_limited": 0, "timeouts": 0, "streamed": 0}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def decide(self):
+        """Fault to inject for the next request ("rate_limit", "timeout" or None) and its latency"""
+        with self.lock:
+            self.counters["requests"] += 1
+            now = time.monotonic()
+            self.window = [t for t in self.window if now - t < 60.0]
+            over_quota = self.rpm is not None and len(self.window) >= self.rpm
+            if not over_quota:
+                self.window.append(now)
+            roll = self.rng.random()
+            latency = self.latency.sample(self.rng)
+        if over_quota or roll < self.rate_limit_p:
+            return "rate_limit", latency
+        if roll < self.rate_limit_p + self.timeout_p:
+            return "timeout", latency
+        return None, latency
+
+    def reply(self, body):
+        with self.lock:
+            if self.script is not None:
+                return str(next(self.script))
+            rng = random.Random(self.rng.random())
+        return mock_reply(body.get("messages", []), rng, body.get("response_format"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so client connection pooling is exercised
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.server.lock:
+                self._send_json(200, dict(self.server.counters))
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        fault, latency = self.server.decide()
+        if fault == "rate_limit":
+            self.server.count("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (injected by mock_server)",
+                           "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after-ms": str(int(max(latency, 0.05) * 1000))},
+            )
+            return
+        if fault == "timeout":
+            self.server.count("timeouts")
+            time.sleep(self.server.hang_s)
+            self.close_connection = True
+            return
+
+        time.sleep(latency)
+        # n > 1 (self-consistency) draws several choices in one request
+        contents = [self.server.reply(body) for _ in range(max(int(body.get("n") or 1), 1))]
+        content = contents[0]
+        usage = {
+            "prompt_tokens": estimate_tokens(body.get("messages", [])),
+            "completion_tokens": estimate_tokens([{"content": c} for c in contents]),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        meta = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()),
+                "model": body.get("model", "mock")}
+
+        if body.get("stream"):
+            self.server.count("streamed")
+            self._stream(meta, content)
+        else:
+            self._send_json(200, {
+                **meta,
+                "object": "chat.completion",
+                "choices": [{"index": i, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": c}}
+                            for i, c in enumerate(contents)],
+                "usage": usage,
+            })
+        self.server.count("completed")
+
+    def _stream(self, meta, content):
+        """Server-sent events, a few characters per chunk, like the real endpoint"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish=None):
+            chunk = {**meta, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for i in range(0, len(content), 4):
+                event({"content": content[i:i + 4]})
+            event({}, finish="stop")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # the client cancelled the stream (early termination)
+            self.close_connection = True
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_server(port=0, **kwargs):
+    """Start a server on a background thread (port 0 picks a free port); returns the server"""
+    server = MockOpenAIServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--latency", default="0", help="fixed:S | uniform:A,B | normal:M,SD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--rate-limit-p", type=float, default=0.0, help="probability of an injected 429")
+    parser.add_argument("--rpm", type=int, default=None, help="requests-per-minute quota (429 above it)")
+    parser.add_argument("--timeout-p", type=float, default=0.0, help="probability of a hung request")
+    parser.add_argument("--hang-s", type=float, default=30.0, help="how long a hung request hangs")
+    parser.add_argument("--script", default=None, help="JSON file with a list of replies to cycle through")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+
+    server = MockOpenAIServer(
+        ("127.0.0.1", args.port), latency=args.latency, rate_limit_p=args.rate_limit_p, rpm=args.rpm,
+        timeout_p=args.timeout_p, hang_s=args.hang_s, script=script, seed=args.seed,
+    )
+    print(f"mock OpenAI server on {server.base_url} (latency={args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Side-by-side comparison of the AICodemaster strategies on the same boards.
+
+For every strategy the same seeds are played against one fixed Guesser, and the Codemaster's
+calls, prompt/completion tokens and LLM latency per turn are reported together with the
+invalid-clue rate and the outcome. "Shortlist" (embedding pre-filter + one compact call)
+needs word vectors (--glove); the other strategies are free-form generation.
+
+Run from the repository root:
+    python -m codenames.benchmarks.strategy_compare --games 10 --glove players/glove.6B.100d.txt
+    python -m codenames.benchmarks.strategy_compare --games 10 --glove players/glove.6B.100d.txt --mock
+    python -m codenames.benchmarks.strategy_compare --strategies Default "Self Refine" Shortlist --guesser llm
+    python -m codenames.benchmarks.strategy_compare --strategies "Self Refine" "Self Refine Parallel" --steps --mock
+
+--mock uses MOCK_GPT (see MOCK_GPT_LATENCY for simulated latency); without it real API calls are made.
+"""
+import argparse
+import os
+import statistics
+import sys
+
+from codenames.game import Game
+from codenames.game_state import ASSASSIN, RED
+from codenames.players.codemaster_gpt import AICodemaster
+from codenames.players.guesser_gpt import AIGuesser
+from codenames.players.vector_guesser import VectorGuesser
+
+
+STRATEGIES = [
+    "Default", "Cautious", "Risky", "COT", "Self Refine", "Self Refine Parallel", "Solo Performance", "Planned",
+    "Shortlist",
+]
+
+
+def play(strategy, seed, guesser, vectors, args):
+    """Play one game; return the Codemaster's per-game figures"""
+    cm_kwargs = {"strategy": strategy, "structured": args.structured}
+    if strategy == "Shortlist":
+        cm_kwargs.update(glove_vecs=vectors, shortlist_size=args.shortlist_size)
+    g_kwargs = {"glove_vecs": vectors} if guesser is VectorGuesser else {"strategy": args.guesser_strategy}
+
+    game = Game(AICodemaster, guesser, seed=seed, do_print=False, do_log=False,
+                cm_kwargs=cm_kwargs, g_kwargs=g_kwargs)
+    game.run()
+    stats = game.llm_stats()["codemaster"]
+    return {
+        "turns": len(game.turn_stats),
+        "calls": stats["calls"],
+        "prompt_tokens": stats["prompt_tokens"],
+        "completion_tokens": stats["completion_tokens"],
+        "latency_s": stats["latency_s"],
+        "invalid_rate": stats["invalid_rate"],
+        "red": game.state.counts[RED],
+        "assassin": game.state.counts[ASSASSIN],
+        "steps": stats["steps"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=10, help="seeds 0..games-1")
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES)
+    parser.add_argument("--glove", default=None, help="GloVe file for Shortlist and the vector Guesser")
+    parser.add_argument("--guesser", choices=["vector", "llm"], default=None,
+                        help="fixed Guesser (default: vector if --glove is given, else llm)")
+    parser.add_argument("--guesser-strategy", default="Default", help="AIGuesser strategy for --guesser llm")
+    parser.add_argument("--shortlist-size", type=int, default=10)
+    parser.add_argument("--structured", action="store_true", help="schema-constrained clues (GPT_STRUCTURED)")
+    parser.add_argument("--mock", action="store_true", help="MOCK_GPT=1, no API calls")
+    parser.add_argument("--steps", action="store_true", help="also print calls and LLM latency per strategy step")
+    args = parser.parse_args()
+
+    if args.mock:
+        os.environ["MOCK_GPT"] = "1"
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark-dummy-key")
+        os.environ.setdefault("GEMINI_API_KEY", "benchmark-dummy-key")
+
+    vectors = Game.load_glove_vecs(args.glove) if args.glove else None
+    guesser_kind = args.guesser or ("vector" if vectors is not None else "llm")
+    if guesser_kind == "vector" and vectors is None:
+        raise SystemExit("--guesser vector needs --glove")
+    guesser = VectorGuesser if guesser_kind == "vector" else AIGuesser
+
+    strategies = list(args.strategies)
+    if "Shortlist" in strategies and vectors is None:
+        print("skipping Shortlist: it needs --glove", file=sys.stderr)
+        strategies.remove("Shortlist")
+
+    print(f"games={args.games} guesser={guesser.__name__} structured={args.structured} mock={args.mock}")
+    header = (
+        f"{'strategy':20s} {'turns':>6s} {'calls/t':>8s} {'prompt/t':>9s} {'compl/t':>8s} "
+        f"{'llm s/t':>8s} {'invalid':>8s} {'red':>5s} {'assassin':>9s}"
+    )
+    print(header)
+    print("-" * len(header))
+    for strategy in strategies:
+        games = [play(strategy, seed, guesser, vectors, args) for seed in range(args.games)]
+        turns = sum(g["turns"] for g in games) or 1
+        print(
+            f"{strategy:20s} "
+            f"{statistics.mean(g['turns'] for g in games):6.1f} "
+            f"{sum(g['calls'] for g in games) / turns:8.2f} "
+            f"{sum(g['prompt_tokens'] for g in games) / turns:9.0f} "
+            f"{sum(g['completion_tokens'] for g in games) / turns:8.0f} "
+            f"{sum(g['latency_s'] for g in games) / turns:8.3f} "
+            f"{statistics.mean(g['invalid_rate'] for g in games):8.2f} "
+            f"{statistics.mean(g['red'] for g in games):5.1f} "
+            f"{sum(g['assassin'] for g in games):9d}"
+        )
+        if args.steps:
+            steps = {}
+            for g in games:
+                for name, step in g["steps"].items():
+                    total = steps.setdefault(name, {"calls": 0, "latency_s": 0.0})
+                    total["calls"] += step["calls"]
+                    total["latency_s"] += step["latency_s"]
+            for name, total in steps.items():
+                print(f"  {name:18s} {'':6s} {total['calls'] / turns:8.2f} {'':9s} {'':8s} {total['latency_s'] / turns:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import colorama
+
+
+_colorama_ready = False
+
+
+def _init_colorama():
+    """colorama.init() wraps sys.stdout, so it must run once per process, not once per game"""
+    global _colorama_ready
+    if not _colorama_ready:
+        colorama.init()
+        _colorama_ready = True
+
+
+class ConsoleDisplay:
+    """
+    Game observer that renders the board and key grid to stdout with colours.
+
+    Game(do_print=True) attaches one; without it the game engine does no rendering at all.
+    It receives the same events as any other observer (on_start, on_clue, on_guess, on_end).
+    """
+
+    def __init__(self):
+        _init_colorama()
+        self.words = []
+        self.key_grid = []
+        self.clue = None
+        self.clue_num = 0
+
+    # ---------------- observer events ----------------
+
+    def on_start(self, seed, words_in_play, key_grid):
+        # called at the start of every turn with live views of the board
+        self.words = words_in_play
+        self.key_grid = key_grid
+        print('\n' * 2)
+        self.display_key_grid()
+        self.display_board_codemaster()
+
+    def on_clue(self, turn, clue, clue_num):
+        self.clue, self.clue_num = clue, clue_num
+        print('\n' * 2)
+        print("The clue is:", clue, clue_num)
+
+    def on_guess(self, guess, role, correct):
+        print("Guess:", guess, "-", role)
+        if correct:
+            print('\n' * 2)
+            self.display_board_codemaster()
+            print("Keep Guessing? the clue is ", self.clue, self.clue_num)
+
+    def on_end(self, score, won):
+        self.display_board_codemaster()
+        print("You Won" if won else "You Lost")
+
+    # ---------------- rendering ----------------
+
+    def display_board_codemaster(self):
+        """prints out board with color-paired words, only for codemaster, color && stylistic"""
+        print(str.center("___________________________BOARD___________________________\n", 60))
+        counter = 0
+        for i in range(len(self.words)):
+            if counter >= 1 and i % 5 == 0:
+                print("\n")
+            if self.key_grid[i] == 'Red':
+                print(str.center(colorama.Fore.RED + self.words[i], 15), " ", end='')
+                counter += 1
+            elif self.key_grid[i] == 'Blue':
+                print(str.center(colorama.Fore.BLUE + self.words[i], 15), " ", end='')
+                counter += 1
+            elif self.key_grid[i] == 'Civilian':
+                print(str.center(colorama.Fore.RESET + self.words[i], 15), " ", end='')
+                counter += 1
+            else:  # Assassin
+                print(str.center(colorama.Fore.MAGENTA + self.words[i], 15), " ", end='')
+                counter += 1
+        print(str.center(colorama.Fore.RESET +
+                         "\n___________________________________________________________", 60))
+        print("\n")
+
+    def display_board(self):
+        """prints the list of words in a board like fashion (5x5)"""
+        print(colorama.Style.RESET_ALL)
+        print(str.center("___________________________BOARD___________________________", 60))
+        for i in range(len(self.words)):
+            if i % 5 == 0:
+                print("\n")
+            print(str.center(self.words[i], 10), " ", end='')
+
+        print(str.center("\n___________________________________________________________", 60))
+        print("\n")
+
+    def display_key_grid(self):
+        """ Print the key grid to stdout  """
+        print("\n")
+        print(str.center(colorama.Fore.RESET +
+                         "____________________________KEY____________________________\n", 55))
+        counter = 0
+        for i in range(len(self.key_grid)):
+            if counter >= 1 and i % 5 == 0:
+                print("\n")
+            if self.key_grid[i] == 'Red':
+                print(str.center(colorama.Fore.RED + self.key_grid[i], 15), " ", end='')
+                counter += 1
+            elif self.key_grid[i] == 'Blue':
+                print(str.center(colorama.Fore.BLUE + self.key_grid[i], 15), " ", end='')
+                counter += 1
+            elif self.key_grid[i] == 'Civilian':
+                print(str.center(colorama.Fore.RESET + self.key_grid[i], 15), " ", end='')
+                counter += 1
+            else:  # Assassin
+                print(str.center(colorama.Fore.MAGENTA + self.key_grid[i], 15), " ", end='')
+                counter += 1
+        print(str.center(colorama.Fore.RESET +
+                         "\n___________________________________________________________", 55))
+        print("\n")
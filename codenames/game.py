@@ -2,20 +2,40 @@ import random
 import time
 import json
 import enum
+import logging
 import os
 import shutil
-import sys
+from functools import lru_cache
 from pathlib import Path
 
-import colorama
 import gensim.models.keyedvectors as word2vec
 import numpy as np
 from nltk.corpus import wordnet_ic
 
+from codenames.display import ConsoleDisplay
+from codenames.game_state import ASSASSIN, BLUE, CIVILIAN, RED, GameState
+from codenames.players.gpt_stats import summarize_calls
+from codenames.players.vectors import cache_enabled, cached_glove
+
 
 # Single canonical log path (JSONL)
 LOG_PATH = Path(os.getenv("CODENAMES_LOG_FILE", "results/bot_results.jsonl"))
 
+logger = logging.getLogger(__name__)
+
+
+def load_wordpool(path="game_wordpool.txt"):
+    """Board word pool as an immutable tuple, read and checked once per file per process"""
+    return _read_wordpool(os.path.abspath(path))
+
+
+@lru_cache(maxsize=None)
+def _read_wordpool(path):
+    with open(path, "r", encoding="utf-8") as f:
+        pool = tuple(f.read().splitlines())
+    assert len(pool) == len(set(pool)), "game_wordpool.txt should not have duplicates"
+    return pool
+
 
 class GameCondition(enum.Enum):
     """Enumeration that represents the different states of the game"""
@@ -45,7 +65,8 @@ class Game:
                 Value used to init random, "time" for time.time().
                 Defaults to "time".
             do_print (bool, optional):
-                Whether to keep on sys.stdout or turn off.
+                Whether to render the board to stdout (a ConsoleDisplay observer).
+                Without it the game does no rendering; messages go through logging either way.
                 Defaults to True.
             do_log (bool, optional):
                 Whether to append to log file or not.
@@ -56,15 +77,14 @@ class Game:
                 kwargs passed to Codemaster.
             g_kwargs (dict, optional):
                 kwargs passed to Guesser.
+            observer (optional):
+                object notified of game events (on_start, on_clue, on_guess, on_end, ...).
         """
 
         self.game_start_time = time.time()
-        colorama.init()
 
         self.do_print = do_print
-        if not self.do_print:
-            self._save_stdout = sys.stdout
-            sys.stdout = open(os.devnull, 'w')
+        self.display = ConsoleDisplay() if do_print else None
 
         self.codemaster = codemaster(**cm_kwargs)
         self.guesser = guesser(**g_kwargs)
@@ -74,39 +94,60 @@ class Game:
         self.do_log = do_log
         self.game_name = game_name
         self.observer = observer  # optional observer hook
+        self.turn_stats = []  # per-turn LLM accounting (see _record_turn_stats)
+        self.total_turns = 0  # game counter as logged (25 for a loss), set when the game ends
 
-        # set seed so that board/keygrid can be reloaded later
+        # set seed so that board/keygrid can be reloaded later; the game draws from its own
+        # generator, so other games in the process (threads, event loop) cannot change its board
         if seed == 'time':
             self.seed = time.time()
-            random.seed(self.seed)
+            self.rng = random.Random(self.seed)
         else:
             self.seed = seed
-            random.seed(int(seed))
+            self.rng = random.Random(int(seed))
 
-        print("seed:", self.seed)
+        logger.info("seed: %s", self.seed)
 
         # load board words
-        with open("game_wordpool.txt", "r", encoding="utf-8") as f:
-            temp = f.read().splitlines()
-            assert len(temp) == len(set(temp)), "game_wordpool.txt should not have duplicates"
-            random.shuffle(temp)
-            self.words_on_board = temp[:25]
+        pool = load_wordpool()
+        temp = list(pool)
+        self.rng.shuffle(temp)
 
         # set grid key for codemaster (spymaster)
-        self.key_grid = ["Red"] * 8 + ["Blue"] * 7 + ["Civilian"] * 9 + ["Assassin"]
-        random.shuffle(self.key_grid)
+        key_grid = ["Red"] * 8 + ["Blue"] * 7 + ["Civilian"] * 9 + ["Assassin"]
+        self.rng.shuffle(key_grid)
 
-    def __del__(self):
-        """reset stdout if using the do_print==False option"""
-        if not self.do_print:
-            sys.stdout.close()
-            sys.stdout = self._save_stdout
+        # board state: word ids into the pool, roles and revealed tiles (see game_state.py)
+        self.state = GameState.from_board(temp[:25], key_grid, vocab=pool)
+
+        # agents with their own random choices (e.g. fallback guesses) get a generator of
+        # this game as well, seeded per role
+        for role, agent in (("codemaster", self.codemaster), ("guesser", self.guesser)):
+            if hasattr(agent, "rng"):
+                agent.rng = random.Random(f"{self.seed}:{role}")
+
+    @property
+    def words_on_board(self):
+        """Read-only live view of the board, with "*Red*"-style markers for revealed words"""
+        return self.state.words()
+
+    @property
+    def key_grid(self):
+        """Read-only view of the key grid"""
+        return self.state.key()
 
     @staticmethod
-    def load_glove_vecs(glove_file_path):
+    def load_glove_vecs(glove_file_path, cache=None):
         """Load stanford nlp glove vectors
         Original source that matches the function: https://nlp.stanford.edu/data/glove.6B.zip
+        By default the text file is converted once to a binary cache next to it and memory-mapped
+        from then on (an EmbeddingTable, see players/vectors.py); cache=False (or
+        CODENAMES_VECTOR_CACHE=0) parses the text into a dict of arrays as before.
         """
+        if cache is None:
+            cache = cache_enabled()
+        if cache:
+            return cached_glove(glove_file_path)
         with open(glove_file_path, encoding="utf-8") as infile:
             glove_vecs = {}
             for line in infile:
@@ -120,71 +161,31 @@ class Game:
         return wordnet_ic.ic(wordnet_file)
 
     @staticmethod
-    def load_w2v(w2v_file_path):
+    def load_w2v(w2v_file_path, cache=None):
         """Function to initalize gensim w2v object from Google News w2v Vectors
         Vectors Source: https://drive.google.com/file/d/0B7XkCwpI5KDYNlNUTTlSS21pQmM/edit
+        By default the vectors are saved once in gensim's native format (<path>.kv plus a .npy
+        matrix) and memory-mapped from then on; cache=False (or CODENAMES_VECTOR_CACHE=0) always
+        parses the word2vec file.
         """
-        return word2vec.KeyedVectors.load_word2vec_format(w2v_file_path, binary=True, unicode_errors='ignore')
-
-    def _display_board_codemaster(self):
-        """prints out board with color-paired words, only for codemaster, color && stylistic"""
-        print(str.center("___________________________BOARD___________________________\n", 60))
-        counter = 0
-        for i in range(len(self.words_on_board)):
-            if counter >= 1 and i % 5 == 0:
-                print("\n")
-            if self.key_grid[i] == 'Red':
-                print(str.center(colorama.Fore.RED + self.words_on_board[i], 15), " ", end='')
-                counter += 1
-            elif self.key_grid[i] == 'Blue':
-                print(str.center(colorama.Fore.BLUE + self.words_on_board[i], 15), " ", end='')
-                counter += 1
-            elif self.key_grid[i] == 'Civilian':
-                print(str.center(colorama.Fore.RESET + self.words_on_board[i], 15), " ", end='')
-                counter += 1
-            else:  # Assassin
-                print(str.center(colorama.Fore.MAGENTA + self.words_on_board[i], 15), " ", end='')
-                counter += 1
-        print(str.center(colorama.Fore.RESET +
-                         "\n___________________________________________________________", 60))
-        print("\n")
-
-    def _display_board(self):
-        """prints the list of words in a board like fashion (5x5)"""
-        print(colorama.Style.RESET_ALL)
-        print(str.center("___________________________BOARD___________________________", 60))
-        for i in range(len(self.words_on_board)):
-            if i % 5 == 0:
-                print("\n")
-            print(str.center(self.words_on_board[i], 10), " ", end='')
-
-        print(str.center("\n___________________________________________________________", 60))
-        print("\n")
-
-    def _display_key_grid(self):
-        """ Print the key grid to stdout  """
-        print("\n")
-        print(str.center(colorama.Fore.RESET +
-                         "____________________________KEY____________________________\n", 55))
-        counter = 0
-        for i in range(len(self.key_grid)):
-            if counter >= 1 and i % 5 == 0:
-                print("\n")
-            if self.key_grid[i] == 'Red':
-                print(str.center(colorama.Fore.RED + self.key_grid[i], 15), " ", end='')
-                counter += 1
-            elif self.key_grid[i] == 'Blue':
-                print(str.center(colorama.Fore.BLUE + self.key_grid[i], 15), " ", end='')
-                counter += 1
-            elif self.key_grid[i] == 'Civilian':
-                print(str.center(colorama.Fore.RESET + self.key_grid[i], 15), " ", end='')
-                counter += 1
-            else:  # Assassin
-                print(str.center(colorama.Fore.MAGENTA + self.key_grid[i], 15), " ", end='')
-                counter += 1
-        print(str.center(colorama.Fore.RESET +
-                         "\n___________________________________________________________", 55))
-        print("\n")
+        if cache is None:
+            cache = cache_enabled()
+        kv_path = w2v_file_path + ".kv"
+        if cache and os.path.exists(kv_path) and os.path.getmtime(kv_path) >= os.path.getmtime(w2v_file_path):
+            return word2vec.KeyedVectors.load(kv_path, mmap='r')
+        vectors = word2vec.KeyedVectors.load_word2vec_format(w2v_file_path, binary=True, unicode_errors='ignore')
+        if cache:
+            # save under a temp name and rename, so readers never see a partial cache
+            # (large arrays go to <name>.<attr>.npy files, which gensim finds next to the .kv)
+            tmp = f"{w2v_file_path}.{os.getpid()}.tmp.kv"
+            try:
+                vectors.save(tmp)
+                for array_file in Path(tmp).parent.glob(Path(tmp).name + ".*.npy"):
+                    os.replace(array_file, kv_path + array_file.name[len(Path(tmp).name):])
+                os.replace(tmp, kv_path)
+            except OSError as e:
+                logger.warning("could not write the vector cache for %s: %s", w2v_file_path, e)
+        return vectors
 
     def get_words_on_board(self):
         """Return the list of words that represent the board state"""
@@ -194,52 +195,95 @@ class Game:
         """Return the codemaster's key"""
         return self.key_grid
 
+    def _board_index(self, word):
+        """Tile of an unrevealed board word via the state's word index (ValueError otherwise, like list.index)"""
+        i = self.state.index(word)
+        if self.state.is_revealed(i):
+            raise ValueError(f"{word!r} is already revealed")
+        return i
+
     def _accept_guess(self, guess_index):
         """Function that takes in an int index called guess to compare with the key grid
         CodeMaster will always win with Red and lose if Blue =/= 7 or Assassin == 1
         """
-        if self.key_grid[guess_index] == "Red":
-            self.words_on_board[guess_index] = "*Red*"
-            if self.words_on_board.count("*Red*") >= 8:
+        role = self.state.reveal(guess_index)
+        if role == RED:
+            if self.state.remaining(RED) == 0:
                 return GameCondition.WIN
             return GameCondition.HIT_RED
 
-        elif self.key_grid[guess_index] == "Blue":
-            self.words_on_board[guess_index] = "*Blue*"
-            if self.words_on_board.count("*Blue*") >= 7:
+        elif role == BLUE:
+            if self.state.remaining(BLUE) == 0:
                 return GameCondition.LOSS
             else:
                 return GameCondition.CONTINUE
 
-        elif self.key_grid[guess_index] == "Assassin":
-            self.words_on_board[guess_index] = "*Assassin*"
+        elif role == ASSASSIN:
             return GameCondition.LOSS
 
         else:
-            self.words_on_board[guess_index] = "*Civilian*"
             return GameCondition.CONTINUE
 
+    def _notify(self, event, *args):
+        """Send a game event to the display and the observer, when they handle it"""
+        for target in (self.display, self.observer):
+            handler = getattr(target, event, None)
+            if handler is not None:
+                handler(*args)
+
+    def _llm_agents(self):
+        """(role, agent) pairs for agents that talk to an LLM through a GPT manager"""
+        agents = (("codemaster", self.codemaster), ("guesser", self.guesser))
+        return [(role, a) for role, a in agents if hasattr(getattr(a, "manager", None), "calls")]
+
+    def _llm_call_marks(self):
+        """Number of LLM calls each agent has made so far (turn boundary for per-turn stats)"""
+        return {role: len(agent.manager.calls) for role, agent in self._llm_agents()}
+
+    def _record_turn_stats(self, turn, marks):
+        """Summarize the LLM calls made since `marks` as the stats of one turn"""
+        stats = {"turn": turn}
+        for role, agent in self._llm_agents():
+            stats[role] = summarize_calls(agent.manager.calls[marks.get(role, 0):])
+        self.turn_stats.append(stats)
+        self._notify("on_turn_stats", stats)
+
+    def llm_stats(self):
+        """
+        Per-game LLM accounting: totals per agent plus the per-turn breakdown.
+        invalid_rate is the share of final clue/guess replies the agent had to reject and re-ask.
+        """
+        stats = {}
+        for role, agent in self._llm_agents():
+            stats[role] = summarize_calls(agent.manager.calls)
+            answers = getattr(agent, "answers", 0)
+            stats[role]["answers"] = answers
+            stats[role]["invalid_answers"] = getattr(agent, "invalid_answers", 0)
+            stats[role]["invalid_rate"] = stats[role]["invalid_answers"] / answers if answers else 0.0
+            if hasattr(agent, "replans"):
+                stats[role]["replans"] = agent.replans
+        stats["turns"] = self.turn_stats
+        return stats
+
     def write_results(self, num_of_turns):
         """Logging function — JSONL only"""
-        red_result = 0
-        blue_result = 0
-        civ_result = 0
-        assa_result = 0
-
-        for w in self.words_on_board:
-            if w == "*Red*":
-                red_result += 1
-            elif w == "*Blue*":
-                blue_result += 1
-            elif w == "*Civilian*":
-                civ_result += 1
-            elif w == "*Assassin*":
-                assa_result += 1
+        LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.results(num_of_turns), ensure_ascii=False) + "\n")
+
+    def results(self, num_of_turns=None):
+        """The game's result record (one line of bot_results.jsonl); defaults to the turns played"""
+        if num_of_turns is None:
+            num_of_turns = self.total_turns
+        red_result, blue_result, civ_result, assa_result = (
+            self.state.counts[role] for role in (RED, BLUE, CIVILIAN, ASSASSIN)
+        )
 
         # ensure end time exists
         if not hasattr(self, "game_end_time"):
             self.game_end_time = time.time()
 
+        managers = [agent.manager for _, agent in self._llm_agents()]
         results = {
             "game_name": self.game_name,
             "total_turns": num_of_turns,
@@ -250,11 +294,12 @@ class Game:
             "time_s": (self.game_end_time - self.game_start_time),
             "cm_kwargs": {k: v if isinstance(v, (float, int, str)) else None for k, v in self.cm_kwargs.items()},
             "g_kwargs": {k: v if isinstance(v, (float, int, str)) else None for k, v in self.g_kwargs.items()},
+            "cache_hits": sum(getattr(m, "cache_hits", 0) for m in managers),
+            "cache_misses": sum(getattr(m, "cache_misses", 0) for m in managers),
+            "history_tokens_saved": sum(c["tokens_saved"] for m in managers for c in m.calls),
+            "llm": self.llm_stats(),
         }
-
-        LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(results, ensure_ascii=False) + "\n")
+        return results
 
     @staticmethod
     def clear_results():
@@ -264,84 +309,111 @@ class Game:
             shutil.rmtree(results_dir)
 
     def run(self):
-        # """Function that runs the codenames game between codemaster and guesser"""
+        """Function that runs the codenames game between codemaster and guesser"""
+        steps = self._play()
+        result = None
+        try:
+            while True:
+                agent, action = steps.send(result)
+                result = getattr(agent, action)()
+        except StopIteration:
+            pass
+
+    async def arun(self):
+        """Async version of run()
+
+        Awaits the agents' async methods (aget_clue, aget_answer, akeep_guessing)
+        when they provide them and falls back to the sync ones otherwise, so many
+        games can share one event loop, e.g. asyncio.gather(*(g.arun() for g in games)).
+        """
+        steps = self._play()
+        result = None
+        try:
+            while True:
+                agent, action = steps.send(result)
+                async_action = getattr(agent, "a" + action, None)
+                if async_action is not None:
+                    result = await async_action()
+                else:
+                    result = getattr(agent, action)()
+        except StopIteration:
+            pass
+
+    def _play(self):
+        """Game loop shared by run/arun.
+        Generator: yields (agent, method name) for every agent decision and receives its result.
+        """
         game_condition = GameCondition.HIT_RED
         game_counter = 0
         while game_condition != GameCondition.LOSS and game_condition != GameCondition.WIN:
-            # board setup and display
-            print('\n' * 2)
+            # board setup
             words_in_play = self.get_words_on_board()
             current_key_grid = self.get_key_grid()
             self.codemaster.set_game_state(words_in_play, current_key_grid)
-            self._display_key_grid()
-            self._display_board_codemaster()
 
-            # observer — game start
-            if getattr(self, "observer", None):
-                self.observer.on_start(self.seed, words_in_play, current_key_grid)
+            # observers (display included) — turn start
+            self._notify("on_start", self.seed, words_in_play, current_key_grid)
 
             # codemaster gives clue & number here
-            clue, clue_num = self.codemaster.get_clue()
+            call_marks = self._llm_call_marks()
+            clue, clue_num = yield self.codemaster, "get_clue"
             game_counter += 1
+            turn = game_counter
             keep_guessing = True
             guess_num = 0
             clue_num = int(clue_num)
 
-            # observer — clue given (use game_counter as the turn number)
-            if getattr(self, "observer", None):
-                self.observer.on_clue(game_counter, clue, clue_num)
-
-            print('\n' * 2)
+            # observers — clue given (use game_counter as the turn number)
+            self._notify("on_clue", game_counter, clue, clue_num)
             self.guesser.set_clue(clue, clue_num)
 
             game_condition = GameCondition.HIT_RED
             while guess_num <= clue_num and keep_guessing and game_condition == GameCondition.HIT_RED:
                 self.guesser.set_board(words_in_play)
-                guess_answer = self.guesser.get_answer()
+                guess_answer = yield self.guesser, "get_answer"
 
                 # if no comparisons were made/found than retry input from codemaster
                 if guess_answer is None or guess_answer == "no comparisons":
                     break
-                guess_answer_index = words_in_play.index(guess_answer.upper().strip())
+                guess_answer_index = self._board_index(guess_answer.upper().strip())
                 game_condition = self._accept_guess(guess_answer_index)
 
-                if getattr(self, "observer", None):
+                if hasattr(self.observer, "log"):
                     # keep a view of the board with revealed markers for the observer
                     self.observer.log.board[guess_answer_index] = f"*{str(current_key_grid[guess_answer_index]).upper()}*"
 
-                # observer — report guess with role + correctness
-                if getattr(self, "observer", None):
-                    role_str = str(current_key_grid[guess_answer_index]).upper()
-                    was_correct = (game_condition == GameCondition.HIT_RED)
-                    self.observer.on_guess(guess_answer, role_str, was_correct)
+                # observers — report guess with role + correctness
+                role_str = str(current_key_grid[guess_answer_index]).upper()
+                was_correct = (game_condition == GameCondition.HIT_RED)
+                self._notify("on_guess", guess_answer, role_str, was_correct)
 
                 if game_condition == GameCondition.HIT_RED:
-                    print('\n' * 2)
-                    self._display_board_codemaster()
                     guess_num += 1
-                    print("Keep Guessing? the clue is ", clue, clue_num)
-                    keep_guessing = self.guesser.keep_guessing()
+                    keep_guessing = yield self.guesser, "keep_guessing"
 
                 elif game_condition == GameCondition.CONTINUE:
                     break
 
                 elif game_condition == GameCondition.LOSS:
                     self.game_end_time = time.time()
+                    self._record_turn_stats(turn, call_marks)
                     game_counter = 25
-                    self._display_board_codemaster()
+                    self.total_turns = game_counter
                     if self.do_log:
                         self.write_results(game_counter)
-                    if getattr(self, "observer", None):
-                        self.observer.on_end(getattr(self, "score", 0), False)
-                    print("You Lost")
-                    print("Game Counter:", game_counter)
+                    self._notify("on_llm_stats", self.llm_stats())
+                    self._notify("on_end", getattr(self, "score", 0), False)
+                    logger.info("Game lost. Game Counter: %s", game_counter)
 
                 elif game_condition == GameCondition.WIN:
                     self.game_end_time = time.time()
-                    self._display_board_codemaster()
+                    self._record_turn_stats(turn, call_marks)
+                    self.total_turns = game_counter
                     if self.do_log:
                         self.write_results(game_counter)
-                    if getattr(self, "observer", None):
-                        self.observer.on_end(getattr(self, "score", 0), True)
-                    print("You Won")
-                    print("Game Counter:", game_counter)
+                    self._notify("on_llm_stats", self.llm_stats())
+                    self._notify("on_end", getattr(self, "score", 0), True)
+                    logger.info("Game won. Game Counter: %s", game_counter)
+
+            if game_condition not in (GameCondition.LOSS, GameCondition.WIN):
+                self._record_turn_stats(turn, call_marks)
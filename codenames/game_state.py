@@ -0,0 +1,160 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+
+ROLES = ("Red", "Blue", "Civilian", "Assassin")
+RED, BLUE, CIVILIAN, ASSASSIN = range(len(ROLES))
+ROLE_IDS = {name: i for i, name in enumerate(ROLES)}
+
+
+class GameState:
+    """
+    Board and key of one game in compact form: word ids into a shared vocabulary (the word
+    pool), an int8 role per tile and a bitmask of revealed tiles, with revealed counts per role
+    so win/loss checks are O(1).
+
+    The words and roles never change during a game, so they are shared between forks; a fork
+    (fork()) only copies the bitmask and the four counters. Agents get read-only views
+    (words(), key()) that look like the board/key lists the game has always passed around.
+    """
+
+    __slots__ = ("vocab", "ids", "roles", "revealed", "counts", "totals", "_index")
+
+    def __init__(self, vocab, ids, roles, revealed=0, counts=None):
+        self.vocab = vocab
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.roles = np.asarray(roles, dtype=np.int8)
+        self.revealed = int(revealed)
+        self.totals = np.bincount(self.roles, minlength=len(ROLES)).tolist()
+        if counts is None:
+            counts = [0] * len(ROLES)
+            for i in range(len(self.ids)):
+                if self.revealed >> i & 1:
+                    counts[self.roles[i]] += 1
+        self.counts = list(counts)
+        self._index = {vocab[w]: i for i, w in enumerate(self.ids.tolist())}
+
+    @classmethod
+    def from_board(cls, words, key_grid, vocab=None):
+        """State for a board (list of words) and key grid (list of role names); `vocab` defaults to the board"""
+        vocab = tuple(vocab) if vocab is not None else tuple(words)
+        word_ids = {w: i for i, w in enumerate(vocab)}
+        return cls(vocab, [word_ids[w] for w in words], [ROLE_IDS[r] for r in key_grid])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def word(self, i):
+        return self.vocab[self.ids[i]]
+
+    def role(self, i):
+        return ROLES[self.roles[i]]
+
+    def index(self, word):
+        """Tile of `word` (ValueError if it is not on the board), in O(1)"""
+        try:
+            return self._index[word]
+        except KeyError:
+            raise ValueError(f"{word!r} is not on the board") from None
+
+    def is_revealed(self, i):
+        return bool(self.revealed >> i & 1)
+
+    def reveal(self, i):
+        """Reveal tile `i` and return its role id"""
+        role = int(self.roles[i])
+        if not self.revealed >> i & 1:
+            self.revealed |= 1 << i
+            self.counts[role] += 1
+        return role
+
+    def remaining(self, role):
+        """Unrevealed tiles of `role` (a role id)"""
+        return self.totals[role] - self.counts[role]
+
+    def fork(self):
+        """Independent copy for simulation; shares the immutable words and roles"""
+        other = object.__new__(GameState)
+        other.vocab, other.ids, other.roles = self.vocab, self.ids, self.roles
+        other.totals, other._index = self.totals, self._index
+        other.revealed = self.revealed
+        other.counts = list(self.counts)
+        return other
+
+    def words(self):
+        """Read-only live view of the board: words, or "*Role*" markers for revealed tiles"""
+        return BoardView(self)
+
+    def key(self):
+        """Read-only view of the key grid (role names)"""
+        return KeyView(self)
+
+
+class _View(Sequence):
+    """Read-only list-like view of a GameState"""
+
+    __slots__ = ("_state",)
+
+    def __init__(self, state):
+        self._state = state
+
+    def __len__(self):
+        return len(self._state)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("board index out of range")
+        return self._item(i)
+
+    def __eq__(self, other):
+        return list(self) == list(other) if isinstance(other, (list, tuple, _View)) else NotImplemented
+
+    def __repr__(self):
+        # prompts embed str(board), so this prints exactly like the list it replaces
+        return repr(list(self))
+
+
+class BoardView(_View):
+    """Board words, with "*Red*" / "*Blue*" / ... in place of revealed words"""
+
+    __slots__ = ()
+
+    def _item(self, i):
+        state = self._state
+        if state.revealed >> i & 1:
+            return f"*{ROLES[state.roles[i]]}*"
+        return state.vocab[state.ids[i]]
+
+    def __contains__(self, word):
+        return self.count(word) > 0
+
+    def count(self, word):
+        """O(1): markers are counted by the revealed counters, words by the index"""
+        state = self._state
+        i = state._index.get(word)
+        if i is not None:
+            return int(not state.is_revealed(i))
+        if isinstance(word, str) and word[:1] == "*" and word[-1:] == "*":
+            role = ROLE_IDS.get(word[1:-1])
+            return state.counts[role] if role is not None else 0
+        return 0
+
+    def index(self, word, *args):
+        i = self._state._index.get(word)
+        if i is not None and not args and not self._state.is_revealed(i):
+            return i
+        return super().index(word, *args)
+
+
+class KeyView(_View):
+    """Role names of the tiles"""
+
+    __slots__ = ()
+
+    def _item(self, i):
+        return ROLES[self._state.roles[i]]
@@ -1,4 +1,24 @@
-import subprocess
-
-for i in range(0,50):
-    subprocess.run(["python", "run_game.py", "players.codemaster_gpt.AICodemaster", "players.guesser_gpt.AIGuesser", "--seed", str(i)])
+"""
+50 GPT games, played in a pool of worker processes (see tournament.py).
+
+Run from the repository root:
+    python -m codenames.gpt_experiments
+or, as before, from the codenames/ directory:
+    python gpt_experiments.py
+"""
+import os
+import sys
+
+if not __package__:
+    # run as a script: make the codenames package importable from the repository root
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codenames.tournament import expand_grid, run_tournament  # noqa: E402
+
+if __name__ == "__main__":
+    jobs = expand_grid(["players.codemaster_gpt.AICodemaster"], ["players.guesser_gpt.AIGuesser"], range(0, 50))
+    for result in run_tournament(jobs):
+        if "error" in result:
+            print(result["seed"], "failed:", result["error"])
+        else:
+            print(result["seed"], result["total_turns"], result["R"], result["B"], result["C"], result["A"])
@@ -1,14 +1,50 @@
-from codenames.players.gpt_manager import game_rules, GPT
+from codenames.players.gpt_manager import game_rules, GPT, run_steps, arun_steps
+from codenames.players.gpt_parsing import (
+    CLUE_PATTERN, CLUE_SCHEMA, clue_parser, clue_schema, distinct_answers, parse_plan, plan_schema,
+    strip_reasoning, structured_clue,
+)
 from codenames.players.codemaster import Codemaster
+from codenames.players.vector_codemaster import VectorCodemaster
+import logging
 import os
 import re
 
+
+logger = logging.getLogger(__name__)
+
 class AICodemaster(Codemaster):
 
-    def __init__(self, team: str = "Red", strategy: str = "Default"):
+    def __init__(self, team: str = "Red", strategy: str = "Default", history=None, stream=None,
+                 structured=None, shortlist_size=10, vectors=None, glove_vecs=None, word_vectors=None,
+                 cot_mode=None, refine_candidates=None):
         super().__init__()
         self.team = team
         self.strategy = strategy
+        # stream replies and stop as soon as a ('word',N) clue has been produced
+        self.stream = os.getenv("GPT_STREAM") == "1" if stream is None else stream
+        # ask for {"clue": str, "number": int} JSON instead of free text
+        self.structured = os.getenv("GPT_STRUCTURED") == "1" if structured is None else structured
+        # final clue replies parsed / rejected as invalid (see Game.llm_stats)
+        self.answers = 0
+        self.invalid_answers = 0
+        # "COT": "two-step" (reasoning call, then an answer call) or "single"
+        # (one schema-constrained reasoning + answer reply; only the answer stays in history)
+        self.cot_mode = (cot_mode or os.getenv("GPT_COT_MODE", "two-step")).strip().lower()
+        # "Self Refine Parallel": candidate clues drawn in one request before the selecting call
+        if refine_candidates is None:
+            refine_candidates = os.getenv("GPT_REFINE_CANDIDATES", "3")
+        self.refine_candidates = int(refine_candidates)
+        # "Planned": remaining clue groups [(clue, [board indices]), ...], the indices the last
+        # planned clue was meant for, what was revealed when it was given, and replans so far
+        self.plan = None
+        self._intended = None
+        self._revealed_at_clue = set()
+        self.replans = 0
+        # "Shortlist": embeddings pick the top clue candidates, the model chooses among them
+        self.shortlist_size = int(shortlist_size)
+        self.scorer = None
+        if str(strategy).strip().lower() == "shortlist":
+            self.scorer = VectorCodemaster(team, vectors, glove_vecs, word_vectors)
 
         system_prompt = (
             game_rules
@@ -27,6 +63,7 @@ class AICodemaster(Codemaster):
             system_prompt=system_prompt,
             version=model,
             provider=provider,
+            history=history,
         )
         self.words = []
         self.maps = []
@@ -40,6 +77,8 @@ class AICodemaster(Codemaster):
         """
         self.words = words
         self.maps = maps
+        if self.scorer is not None:
+            self.scorer.set_game_state(words, maps)
 
     def get_remaining_options(self):
         """Split remaining (unguessed) words by role for prompting."""
@@ -75,14 +114,38 @@ class AICodemaster(Codemaster):
         return prompt
     
     def get_clue(self):
-        if os.getenv("MOCK_GPT") == "1":
-            return "animal", 2
+        return run_steps(self.manager, self._clue_steps(), step="clue", **self._answer_options())
+
+    async def aget_clue(self):
+        """Async version of get_clue (same strategies, awaits the model)"""
+        return await arun_steps(self.manager, self._clue_steps(), step="clue", **self._answer_options())
 
+    def _answer_options(self):
+        """
+        talk_to_ai kwargs for the final clue prompts (intermediate steps are left alone).
+        A schema-constrained reply is already just the answer, so it is not streamed.
+        """
+        if self.structured:
+            return {"response_schema": CLUE_SCHEMA}
+        return {"stream_parser": clue_parser} if self.stream else {}
+
+    def _clue_steps(self):
+        """
+        Strategy logic shared by get_clue/aget_clue.
+        Generator: yields each prompt, receives the model reply, returns [clue, number].
+        """
+        self.manager.new_turn()
         invalid_timer = 0
         clue = None
         number = None
         red, blue, civilian, assassin = self.get_remaining_options()
 
+        if str(getattr(self, "strategy", "Default")).strip().lower() == "planned":
+            planned = yield from self._planned_clue_steps(red, blue, civilian, assassin)
+            if planned is not None:
+                return planned
+            # no usable plan: this turn falls back to the Default prompt below
+
         while clue is None or number is None:
             label = str(getattr(self, "strategy", "Default")).strip().lower()
 
@@ -95,7 +158,7 @@ class AICodemaster(Codemaster):
                 prompt += "Assassin: " + str(assassin) + ". "
                 prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
         # ---------- CAUTIOUS ----------
             elif label == "cautious":
@@ -107,7 +170,7 @@ class AICodemaster(Codemaster):
                 prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
                 prompt += "Make sure that the number for your guess is always 1. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
         # ---------- RISKY ----------
             elif label == "risky":
@@ -119,7 +182,25 @@ class AICodemaster(Codemaster):
                 prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
                 prompt += "Make sure to pick a large number for your guess. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
+
+        # ---------- CHAIN-OF-THOUGHT (single call) ----------
+            elif label == "cot" and self.cot_mode == "single":
+                prompt = "The remaining words are: "
+                prompt += "Red: " + str(red) + ". "
+                prompt += "Blue: " + str(blue) + ". "
+                prompt += "Civilian: " + str(civilian) + ". "
+                prompt += "Assassin: " + str(assassin) + ". "
+                prompt += "Provide a single word clue and number for the guesser. "
+                prompt += "The clue cannot be derived from or derive one of the words on the board. "
+                prompt += "Solve the task step by step: write your reasoning first, then the clue "
+                prompt += "and how many Red words it relates to. "
+                response = yield {
+                    "prompt": prompt,
+                    "response_schema": clue_schema(reasoning=True),
+                    "record_as": strip_reasoning,
+                }
+                response = structured_clue(response)
 
         # ---------- CHAIN-OF-THOUGHT (two-step) ----------
             elif label == "cot":
@@ -136,10 +217,10 @@ class AICodemaster(Codemaster):
                     Steps: Your steps here.
                     Answer: (a single word here) / (A list of words here)
                 """
-                _ = self.manager.talk_to_ai(prompt)  # explanation not parsed; just primes the model
+                _ = yield {"prompt": prompt, "step": "cot_reasoning"}  # explanation not parsed; just primes the model
                 prompt = "Give me only the final answer in the previous prompt in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
         # ---------- SELF-REFINE ----------
             elif label in {"self refine", "self-refine", "self_refine"}:
@@ -150,7 +231,7 @@ class AICodemaster(Codemaster):
                 prompt += "Assassin: " + str(assassin) + ". "
                 prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
                 prompt += "The clue should avoid associations with Blue, Assassin and Civilian words. "
-                initial_response = self.manager.talk_to_ai(prompt)
+                initial_response = yield {"prompt": prompt, "step": "initial_clue"}
 
                 other_words = "{" + str(blue).replace("[", "").replace("]", "").replace("'", "") + ", " + \
                             str(assassin).replace("[", "").replace("]", "").replace("'", "") + ", " + \
@@ -163,7 +244,7 @@ class AICodemaster(Codemaster):
                     Feedback:
                     …
                 """
-                feedback = self.manager.talk_to_ai(prompt)
+                feedback = yield {"prompt": prompt, "step": "feedback"}
 
                 prompt = "The remaining words are: "
                 prompt += "Red: " + str(red) + ". "
@@ -174,7 +255,47 @@ class AICodemaster(Codemaster):
                 prompt += "You can stick with the initial clue if the feedback indicates that this is a good choice. "
                 prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
+
+            # ---------- SELF-REFINE, PARALLEL CANDIDATES ----------
+            elif label in {"self refine parallel", "self-refine-parallel", "self_refine_parallel"}:
+                # round trip 1: several candidate clues drawn concurrently in one request
+                prompt = "The remaining words are: "
+                prompt += "Red: " + str(red) + ". "
+                prompt += "Blue: " + str(blue) + ". "
+                prompt += "Civilian: " + str(civilian) + ". "
+                prompt += "Assassin: " + str(assassin) + ". "
+                prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
+                prompt += "The clue should avoid associations with Blue, Assassin and Civilian words. "
+                prompt += "Stick to this format exactly and provide no additional text. "
+                request = {
+                    "prompt": prompt,
+                    "step": "candidates",
+                    "samples": self.refine_candidates,
+                    "vote": distinct_answers(lambda text: clue_parser(structured_clue(text), final=True)),
+                }
+                if self.structured:
+                    request["response_schema"] = CLUE_SCHEMA
+                candidates = yield request
+
+                # round trip 2: critique all candidates and select one
+                other_words = ", ".join(blue + assassin + civilian)
+                prompt = "Candidate Codenames clues: " + candidates + ". "
+                prompt += "For each candidate, evaluate how related it is to the Red words {" + ", ".join(red) + "} "
+                prompt += "and the likelihood of accidental association with the words {" + other_words + "}. "
+                prompt += "Then select the best candidate and give it in the following format ('pebble',2). "
+                request = {"prompt": prompt}
+                if self.structured:
+                    # the critique goes in the reasoning field; the history keeps the selection
+                    words = [m.group(1).upper() for m in CLUE_PATTERN.finditer(candidates)]
+                    request["response_schema"] = clue_schema(list(dict.fromkeys(words)), reasoning=True)
+                    request["record_as"] = strip_reasoning
+                else:
+                    prompt += "Do the evaluation internally and return only the selected clue, with no additional text. "
+                    request["prompt"] = prompt
+                    if self.stream:
+                        request["stream_parser"] = clue_parser
+                response = yield request
 
             # ---------- SOLO-PERFORMANCE ----------
             elif label in {"solo performance", "solo-performance", "solo_performance"}:
@@ -223,10 +344,27 @@ class AICodemaster(Codemaster):
                             str(assassin).replace("[", "").replace("]", "").replace("'", "") + ", " + \
                             str(civilian).replace("[", "").replace("]", "").replace("'", "") +"}"
                 prompt += "Here are the rest of the words on the board: " + other_words + ". "
-                initial_response = self.manager.talk_to_ai(prompt)
+                initial_response = yield {"prompt": prompt, "step": "solo_collaboration"}
                 prompt = "Give me only the final answer in the previous response in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
+
+            # ---------- SHORTLIST (embedding pre-filter, one compact call) ----------
+            elif label == "shortlist":
+                candidates = self.scorer.shortlist(self.shortlist_size)
+                prompt = "Your words: " + ", ".join(red) + ". "
+                prompt += "Avoid: " + ", ".join(blue + civilian) + ". Assassin: " + ", ".join(assassin) + ". "
+                prompt += "Candidate clues (with the words each fits): "
+                prompt += "; ".join(f"{c.upper()} ({', '.join(ws)})" for c, _, ws in candidates) + ". "
+                prompt += "Pick the candidate your guesser will connect to your words and not to the others, "
+                prompt += "and how many of your words it is for. "
+                prompt += "Answer in the format ('pebble',2) with no additional text. "
+                request = {"prompt": prompt}
+                if self.structured:
+                    request["response_schema"] = clue_schema([c.upper() for c, _, _ in candidates])
+                elif self.stream:
+                    request["stream_parser"] = clue_parser
+                response = yield request
 
             # ---------- FALLBACK → DEFAULT ----------
             else:
@@ -237,32 +375,92 @@ class AICodemaster(Codemaster):
                 prompt += "Assassin: " + str(assassin) + ". "
                 prompt += "Provide a single word clue and number for the guesser in the following format ('pebble',2). "
                 prompt += "Stick to this format exactly and provide no additional text. "
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
             # ---------- parse & validate ----------
+            if self.structured:
+                response = structured_clue(response)
+            self.answers += 1
             try:
                 split_input = response.upper().strip().split(",")
                 clue = re.sub(r'[^A-Z]', '', split_input[0])
                 number = int(re.sub(r'[^0-9]', '', split_input[1]))
                 if number < 1:
-                    print("Warning! Invalid clue: " + response + "\nThe clue number must be greater than zero. ")
+                    logger.warning("Invalid clue: %s. The clue number must be greater than zero.", response)
                     clue = None; number = None; invalid_timer += 1
                 else:
                     for i in range(len(self.words)):
                         if self.words[i][0] != '*':
                             if clue in self.words[i] or self.words[i] in clue:
-                                print("Warning! Invalid clue: " + response + "\nThe clue cannot be derived from or derive one of the words on the board. ")
+                                logger.warning("Invalid clue: %s. The clue cannot be derived from or derive one of the words on the board.", response)
                                 clue = None; number = None; invalid_timer += 1
                                 break
             except Exception:
-                print("Warning! Invalid clue: " + response + "\nThat clue format is invalid. ")
+                logger.warning("Invalid clue: %s. That clue format is invalid.", response)
                 clue = None; number = None; invalid_timer += 1
+            if clue is None or number is None:
+                self.invalid_answers += 1
 
             if invalid_timer > 10:
-                print("You have made too many invalid clues, selecting a default empty clue")
+                logger.warning("Too many invalid clues, selecting a default empty clue")
                 return ["", 1]
 
+        if self.scorer is not None:
+            self.scorer.mark_given(clue)
         return [clue, number]
 
     
-    
\ No newline at end of file
+    
+
+    # ---------------- clue plan ----------------
+
+    def _planned_clue_steps(self, red, blue, civilian, assassin):
+        """
+        "Planned": one call partitions the red words into clue groups, and later turns give the
+        next group without calling the model as long as the board changed exactly as intended
+        (the guesser revealed the words of the last clue and nothing else). Any other change, or
+        a used-up plan, triggers a new plan. Returns [clue, number], or None without a usable plan.
+        """
+        revealed = {i for i, w in enumerate(self.words) if w[0] == "*"}
+        if self._intended is not None and revealed - self._revealed_at_clue != self._intended:
+            logger.info("The guesser deviated from the clue plan, replanning")
+            self.replans += 1
+            self.plan = None
+
+        if not self.plan:
+            prompt = "The remaining words are: "
+            prompt += "Red: " + str(red) + ". "
+            prompt += "Blue: " + str(blue) + ". "
+            prompt += "Civilian: " + str(civilian) + ". "
+            prompt += "Assassin: " + str(assassin) + ". "
+            prompt += "Plan the rest of the game: partition the Red words into groups, each with a single word clue "
+            prompt += "that links the words of its group and avoids associations with Blue, Assassin and Civilian words. "
+            prompt += "The clues cannot be derived from or derive one of the words on the board. "
+            prompt += "List the group to play first first. "
+            prompt += "Return one group per line in the format CLUE: WORD1, WORD2 with no additional text. "
+            request = {"prompt": prompt, "step": "plan"}
+            if self.structured:
+                request["response_schema"] = plan_schema(red)
+            response = yield request
+            self.plan = self._legal_plan(parse_plan(response, red))
+            self.answers += 1
+            if not self.plan:
+                logger.warning("No usable clue plan from the model: %s", response)
+                self.invalid_answers += 1
+                self._intended = None
+                return None
+
+        clue, indices = self.plan.pop(0)
+        self._intended = set(indices)
+        self._revealed_at_clue = revealed
+        return [clue, len(indices)]
+
+    def _legal_plan(self, plan):
+        """Plan groups as board indices, without clues that derive from / derive a remaining board word"""
+        index = {w.upper(): i for i, w in enumerate(self.words) if w[0] != "*"}
+        legal = []
+        for clue, group in plan:
+            clue = re.sub(r"[^A-Z]", "", clue.upper())
+            if clue and not any(clue in w or w in clue for w in index):
+                legal.append((clue, [index[w] for w in group]))
+        return legal
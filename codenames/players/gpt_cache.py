@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_CACHE_PATH = "results/gpt_cache.sqlite"
+
+
+class ResponseCache:
+    """On-disk store of model replies, keyed by a hash of the full request.
+
+    Entries are evicted when they are older than ``max_age_s`` or when the
+    store grows past ``max_entries`` (least recently used go first).
+    One instance can be shared by every GPT object in the process.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=50000, max_age_s=30 * 24 * 3600):
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self.max_age_s = float(max_age_s)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider, model, messages, params=None):
+        """Stable hash of everything that influences the reply."""
+        payload = json.dumps(
+            {"provider": provider, "model": model, "messages": messages, "params": params or {}},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached reply for ``key`` or None if missing/expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created = row
+            if now - created > self.max_age_s:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return response
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age_s,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(path=None):
+    """Process-wide cache for ``path``; None reads GPT_CACHE / GPT_CACHE_PATH from the env.
+
+    Returns None when caching is not enabled.
+    """
+    if path is None:
+        if os.getenv("GPT_CACHE") != "1":
+            return None
+        path = os.getenv("GPT_CACHE_PATH", DEFAULT_CACHE_PATH)
+
+    path = str(path)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ResponseCache(
+                path,
+                max_entries=int(os.getenv("GPT_CACHE_MAX_ENTRIES", "50000")),
+                max_age_s=float(os.getenv("GPT_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600,
+            )
+        return _caches[path]
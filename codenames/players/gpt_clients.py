@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from google import genai
+from google.genai import types
+
+
+_clients = {}                                # (provider, api_key, base_url) -> sync client
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {(provider, api_key, base_url): async client}
+_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def pool_limits():
+    """
+    Connection-pool limits for the shared HTTP clients:
+    GPT_MAX_CONNECTIONS, GPT_MAX_KEEPALIVE and GPT_KEEPALIVE_S (idle keep-alive in seconds).
+    """
+    return httpx.Limits(
+        max_connections=int(os.getenv("GPT_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("GPT_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("GPT_KEEPALIVE_S", "60")),
+    )
+
+
+def new_client(provider, api_key, base_url=None):
+    """
+    Build a fresh sync client (own connection pool).
+    `base_url` points the client at another endpoint, e.g. benchmarks/mock_server.py.
+    """
+    if provider == "openai":
+        # max_retries=0: retries (429s, dropped connections, 5xx) and their accounting belong to GPT.talk_to_ai
+        return OpenAI(api_key=api_key, base_url=base_url, max_retries=0,
+                      http_client=DefaultHttpxClient(limits=pool_limits()))
+    if provider == "gemini":
+        limits = pool_limits()
+        return genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                base_url=base_url, client_args={"limits": limits}, async_client_args={"limits": limits}
+            ),
+        )
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def get_client(provider, api_key, base_url=None):
+    """Process-wide sync client for provider/api_key/base_url, so games reuse warm connections"""
+    key = (provider, api_key, base_url)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = new_client(provider, api_key, base_url)
+        return _clients[key]
+
+
+def new_async_client(provider, api_key, base_url=None):
+    """Build a fresh async OpenAI client with the same retry policy and pool limits as new_client"""
+    if provider != "openai":
+        raise ValueError(f"No separate async client for provider: {provider}")
+    return AsyncOpenAI(
+        api_key=api_key, base_url=base_url, max_retries=0,
+        http_client=DefaultAsyncHttpxClient(limits=pool_limits()),
+    )
+
+
+def get_async_client(provider, api_key, base_url=None):
+    """
+    Shared async client for provider/api_key on the running event loop.
+    Async connection pools are tied to the loop that created them, so there is one per loop.
+    """
+    if provider == "gemini":
+        # the genai client carries its own async transport
+        return get_client(provider, api_key, base_url).aio
+
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        key = (provider, api_key, base_url)
+        if key not in per_loop:
+            per_loop[key] = new_async_client(provider, api_key, base_url)
+        return per_loop[key]
+
+
+_context_caches = {}   # (model, system_instruction) -> (cached content name or None, expires at)
+_context_locks = {}    # (model, system_instruction) -> lock held while that cache is created
+_context_lock = threading.Lock()   # guards the two dicts above; never held during a network call
+
+
+def get_gemini_context_cache(client, model, system_instruction):
+    """
+    Name of an explicit Gemini context cache holding `system_instruction` (the game_rules
+    prefix + role), shared by the process and renewed shortly before it expires; None if
+    caching is off or not possible. Enabled with GEMINI_CONTEXT_CACHE=1;
+    GEMINI_CONTEXT_CACHE_TTL_S sets the lifetime (default 3600).
+    Models have a minimum cacheable size, so a failed create is remembered and the
+    caller falls back to sending the system instruction inline.
+    """
+    if os.getenv("GEMINI_CONTEXT_CACHE") != "1" or not system_instruction:
+        return None
+
+    key = (model, system_instruction)
+    ttl = float(os.getenv("GEMINI_CONTEXT_CACHE_TTL_S", "3600"))
+    with _context_lock:
+        key_lock = _context_locks.setdefault(key, threading.Lock())
+    # one create per key at a time; other keys and the client getters are not held up
+    with key_lock:
+        with _context_lock:
+            name, expires_at = _context_caches.get(key, (None, 0.0))
+            if key in _context_caches and (name is None or time.time() < expires_at):
+                return name
+        try:
+            cached = client.caches.create(
+                model=model,
+                config={
+                    "system_instruction": system_instruction,
+                    "ttl": f"{int(ttl)}s",
+                    "display_name": "codenames-game-rules",
+                },
+            )
+            # renew a little early so in-flight requests never reference an expired cache
+            entry = (cached.name, time.time() + 0.9 * ttl)
+        except Exception as e:
+            logger.warning("[Gemini] context cache unavailable (%s); sending the system prompt inline.", e)
+            entry = (None, 0.0)
+        with _context_lock:
+            _context_caches[key] = entry
+        return entry[0]
@@ -0,0 +1,116 @@
+import os
+
+
+def estimate_tokens(messages):
+    """Rough prompt size (~4 characters per token plus a few per message)"""
+    return sum(4 + len(str(m.get("content", ""))) // 4 for m in messages)
+
+
+def _drop_leading_replies(rest):
+    """Never start the carried-over part with a dangling reply (Gemini rejects a leading model turn)"""
+    while len(rest) > 1 and rest[0]["role"] == "assistant":
+        rest = rest[1:]
+    return rest
+
+
+class HistoryPolicy:
+    """
+    Decides which part of GPT.conversation_history is sent with a request.
+    The system prompt (first message) and the newest user message are always kept;
+    with a token_budget, the oldest remaining messages are dropped until it fits.
+    """
+
+    name = "full"
+
+    def __init__(self, token_budget=None):
+        self.token_budget = int(token_budget) if token_budget else None
+
+    def select(self, history, turn_starts=()):
+        messages = self._select(history, turn_starts)
+        if self.token_budget is not None:
+            messages = self._fit_budget(messages)
+        return messages
+
+    def _select(self, history, turn_starts):
+        return list(history)
+
+    def _fit_budget(self, messages):
+        system, rest = messages[:1], messages[1:]
+        while len(rest) > 1 and estimate_tokens(system + rest) > self.token_budget:
+            rest = _drop_leading_replies(rest[1:])
+        return system + rest
+
+
+class FullHistory(HistoryPolicy):
+    """Send everything (the original behaviour)"""
+
+
+class SlidingWindowHistory(HistoryPolicy):
+    """System prompt + the last ``max_messages`` messages"""
+
+    name = "window"
+
+    def __init__(self, max_messages=6, token_budget=None):
+        super().__init__(token_budget)
+        self.max_messages = max(1, int(max_messages))
+
+    def _select(self, history, turn_starts):
+        return history[:1] + _drop_leading_replies(history[1:][-self.max_messages:])
+
+
+class LastTurnsHistory(HistoryPolicy):
+    """System prompt + every message from the last ``turns`` game turns (see GPT.new_turn)"""
+
+    name = "turns"
+
+    def __init__(self, turns=2, token_budget=None):
+        super().__init__(token_budget)
+        self.turns = max(1, int(turns))
+
+    def _select(self, history, turn_starts):
+        if len(turn_starts) < self.turns:
+            return list(history)
+        start = max(1, turn_starts[-self.turns])
+        return history[:1] + history[start:]
+
+
+class PinnedBoardHistory(LastTurnsHistory):
+    """
+    System prompt + the current turn only.
+    Every turn starts with a prompt listing the current board, so earlier turns add nothing
+    the model needs; multi-call strategies (COT, Self Refine, ...) still see their own turn.
+    """
+
+    name = "pinned"
+
+    def __init__(self, token_budget=None):
+        super().__init__(turns=1, token_budget=token_budget)
+
+
+HISTORY_POLICIES = {
+    "full": FullHistory,
+    "window": SlidingWindowHistory,
+    "turns": LastTurnsHistory,
+    "pinned": PinnedBoardHistory,
+}
+
+
+def make_history_policy(spec=None, token_budget=None):
+    """
+    Build a policy from a spec such as "full", "window:8", "turns:2" or "pinned".
+    None reads GPT_HISTORY / GPT_TOKEN_BUDGET from the env.
+    """
+    if isinstance(spec, HistoryPolicy):
+        return spec
+    if spec is None:
+        spec = os.getenv("GPT_HISTORY", "full")
+    if token_budget is None:
+        token_budget = os.getenv("GPT_TOKEN_BUDGET") or None
+
+    name, _, arg = str(spec).strip().lower().partition(":")
+    if name not in HISTORY_POLICIES:
+        raise ValueError(f"Unknown history policy: {spec}")
+    cls = HISTORY_POLICIES[name]
+    if arg and cls in (SlidingWindowHistory, LastTurnsHistory):
+        return cls(int(arg), token_budget=token_budget)
+    return cls(token_budget=token_budget)
@@ -1,9 +1,23 @@
+import asyncio
+import logging
 import os
-from openai import OpenAI
 import time
-from openai import RateLimitError
+from openai import APIConnectionError, InternalServerError, RateLimitError
 import random
-from google import genai
+from codenames.players.gpt_cache import ResponseCache, get_cache
+from codenames.players.gpt_clients import (
+    get_async_client, get_client, get_gemini_context_cache, new_async_client, new_client,
+)
+from codenames.players.gpt_history import estimate_tokens, make_history_policy
+from codenames.players.gpt_mock import LatencyProfile, mock_reply
+from codenames.players.gpt_parsing import majority_vote
+from codenames.players.gpt_ratelimit import get_limiter
+
+logger = logging.getLogger(__name__)
+
+# errors retried with backoff by talk_to_ai (the clients themselves never retry):
+# 429s, dropped connections and timeouts (APITimeoutError is an APIConnectionError) and 5xx
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
 api_key = os.getenv("OPENAI_API_KEY")
 api_key = os.getenv("GEMINI_API_KEY")
 
@@ -36,7 +50,8 @@ You select the assassin tile -- you lose
 
 """
 class GPT:
-    def __init__(self, system_prompt, version, provider=None):
+    def __init__(self, system_prompt, version, provider=None, cache=None, history=None,
+                 shared_client=True, base_url=None):
         super().__init__()
 
         # "openai" or "gemini"
@@ -47,89 +62,505 @@ class GPT:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise RuntimeError("OPENAI_API_KEY env var is not set")
-            self.client = OpenAI(api_key=api_key)
 
         elif self.provider == "gemini":
             api_key = os.getenv("GEMINI_API_KEY")
             if not api_key:
                 raise RuntimeError("GEMINI_API_KEY env var is not set")
-            self.client = genai.Client(api_key=api_key)
 
         else:
             raise ValueError(f"Unknown LLM provider: {self.provider}")
 
+        # alternative endpoint, e.g. the local stand-in server in benchmarks/mock_server.py
+        if base_url is None and self.provider == "openai":
+            base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.base_url = base_url
+
+        # clients (and their connection pools) are shared process-wide unless shared_client=False
+        self.shared_client = shared_client
+        if shared_client:
+            self.client = get_client(self.provider, api_key, base_url)
+        else:
+            self.client = new_client(self.provider, api_key, base_url)
+        self._api_key = api_key
+        self._async_client = None
         self.conversation_history = [{"role": "system", "content": system_prompt}]
 
-    def _mock_reply(self, prompt: str) -> str:
-        text = prompt.lower()
-        if "codemaster" in text or "clue" in text:
-            return "('animal',2)"
-        if "guess" in text:
-            return "DOG, CAT"
-        return "SAFE"
+        # optional on-disk reply cache (GPT_CACHE=1, or a path / ResponseCache)
+        self.cache = cache if isinstance(cache, ResponseCache) else get_cache(cache)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # which part of the history is sent (GPT_HISTORY=full|window:N|turns:N|pinned)
+        self.history_policy = make_history_policy(history)
+        self.turn_starts = []
+
+        # client-side pacing shared by every GPT for this provider/model (GPT_RATE_LIMITS)
+        self.rate_limiter = get_limiter(self.provider, self.model_version)
+
+        # one accounting record per talk_to_ai call (see gpt_stats.summarize_calls)
+        self.calls = []
+
+    def new_turn(self):
+        """Mark the start of a game turn (used by turn-based history policies)"""
+        self.turn_starts.append(len(self.conversation_history))
+
+    def _outgoing_messages(self, call):
+        """Messages sent with the next request, after applying the history policy"""
+        messages = self.history_policy.select(self.conversation_history, self.turn_starts)
+        call["tokens_saved"] = estimate_tokens(self.conversation_history) - estimate_tokens(messages)
+        return messages
+
+    @staticmethod
+    def _new_call(step: str) -> dict:
+        return {
+            "step": step,              # which strategy step issued the call
+            "source": "api",           # api | cache | mock
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency_s": 0.0,
+            "retries": 0,
+            "queue_wait_s": 0.0,       # time spent waiting on the rate limiter
+            "streamed": False,
+            "stream_cancelled": False,  # stopped early once a valid answer was parsed
+            "ttfva_s": None,            # time to first valid answer (streamed calls)
+            "samples": 1,               # replies drawn in this request (self-consistency)
+            "agreement": None,          # share of samples agreeing with the voted answer
+            "tokens_saved": 0,
+            "_t0": time.perf_counter(),
+        }
 
-    def talk_to_ai(self, prompt: str, max_retries: int = 5) -> str:
+    @property
+    def async_client(self):
+        """Async client for atalk_to_ai, created on first use"""
+        if self.shared_client:
+            return get_async_client(self.provider, self._api_key, self.base_url)
+        if self._async_client is None:
+            if self.provider == "openai":
+                self._async_client = new_async_client(self.provider, self._api_key, self.base_url)
+            else:
+                self._async_client = self.client.aio
+        return self._async_client
+
+    def _store(self, cache_key, response):
+        if cache_key is not None and response is not None:
+            self.cache.put(cache_key, response)
+
+    def _mock_reply(self, messages, response_schema=None, samples=1):
         """
-        Send a message to the model, with:
-        - optional mock mode (MOCK_GPT=1)
-        - retry on RateLimitError for OpenAI
+        Board-aware mock reply (see gpt_mock.py) and its simulated latency.
+        The choice is seeded by MOCK_GPT_SEED and the conversation itself, so a game replays
+        identically whatever the call order; MOCK_GPT_LATENCY takes a LatencyProfile spec.
+        """
+        seed = os.getenv("MOCK_GPT_SEED", "0")
+        rng = random.Random(f"{seed}:{messages}")
+        response_format = None
+        if response_schema is not None:
+            response_format = {"type": "json_schema", "json_schema": response_schema}
+        response = mock_reply(messages, rng, response_format)
+        if samples > 1:
+            response = [response] + [mock_reply(messages, rng, response_format) for _ in range(samples - 1)]
+        delay = LatencyProfile(os.getenv("MOCK_GPT_LATENCY", "0")).sample(rng)
+        return response, delay
+
+    def _begin(self, prompt: str, call: dict, response_schema=None, samples=1):
+        """
+        Record the user message and try to answer without the API.
+        Returns (response, cache_key, messages); response is None when a real call is needed.
         """
         # Add user message
         self.conversation_history.append({"role": "user", "content": prompt})
+        messages = self._outgoing_messages(call)
 
         # Mock mode for debugging / no-API runs
         if os.getenv("MOCK_GPT") == "1":
-            response = self._mock_reply(prompt)
-            self.conversation_history.append(
-                {"role": "assistant", "content": response}
-            )
+            call["source"] = "mock"
+            response, call["_mock_delay"] = self._mock_reply(messages, response_schema, samples)
+            # estimated sizes so mock runs still show how prompts grow
+            replies = response if isinstance(response, list) else [response]
+            call["prompt_tokens"] = estimate_tokens(messages)
+            call["completion_tokens"] = estimate_tokens([{"content": r} for r in replies])
+            return response, None, messages
+
+        # Cache lookup: identical conversation + params -> identical reply
+        cache_key = None
+        if self.cache is not None:
+            params = self._params()
+            if response_schema is not None:
+                params["response_schema"] = response_schema
+            if samples > 1:
+                params["n"] = samples
+            cache_key = ResponseCache.make_key(self.provider, self.model_version, messages, params)
+            response = self.cache.get(cache_key)
+            if response is not None:
+                self.cache_hits += 1
+                call["source"] = "cache"
+                return response, None, messages
+            self.cache_misses += 1
+
+        return None, cache_key, messages
+
+    def _finish(self, response: str, call: dict, cache_key=None, record_as=None) -> str:
+        """
+        Store the reply in the cache and the conversation history, and close the call record.
+        `record_as(reply)` is what the history keeps instead of the whole reply (the cache
+        still stores the whole reply). A stream cancelled at its first valid answer is not
+        cached: the cut-off text is no reply for a later, non-streamed call.
+        """
+        call["latency_s"] = time.perf_counter() - call.pop("_t0")
+        self.calls.append(call)
+        if not call["stream_cancelled"]:
+            self._store(cache_key, response)
+        self.conversation_history.append(
+            {"role": "assistant", "content": record_as(response) if record_as else response}
+        )
+        return response
+
+    @staticmethod
+    def _openai_usage(call: dict, completion):
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            call["prompt_tokens"] = usage.prompt_tokens or 0
+            call["completion_tokens"] = usage.completion_tokens or 0
+
+    @staticmethod
+    def _gemini_usage(call: dict, resp):
+        usage = getattr(resp, "usage_metadata", None)
+        if usage is not None:
+            call["prompt_tokens"] = usage.prompt_token_count or 0
+            call["completion_tokens"] = usage.candidates_token_count or 0
+
+    def _request_tokens(self, messages) -> int:
+        """Tokens reserved on the rate limiter for one request (prompt estimate + max reply)"""
+        return estimate_tokens(messages) + self._params()["max_tokens"]
+
+    def _settle_rate_limit(self, call: dict, reserved: int):
+        """Return reserved-but-unused tokens to the limiter once the real usage is known"""
+        used = call["prompt_tokens"] + call["completion_tokens"]
+        if self.rate_limiter is not None and used:
+            self.rate_limiter.refund(reserved - used)
+
+    def _params(self) -> dict:
+        """Generation params sent with every request (also part of the cache key)"""
+        return {"max_tokens": 512}
+
+    def _gemini_request(self, messages, response_schema=None, samples=1) -> dict:
+        """
+        generate_content kwargs for Gemini: the conversation as native multi-turn contents,
+        the system prompt as system_instruction (or an explicit context cache, see
+        gpt_clients.get_gemini_context_cache). Keeps the prefix identical between calls,
+        so the provider can reuse it instead of re-reading one big flattened string.
+        With `response_schema` the reply is constrained to JSON matching it;
+        `samples` > 1 asks for that many candidates.
+        """
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+            for m in messages
+            if m["role"] != "system"
+        ]
+        config = {"max_output_tokens": self._params()["max_tokens"]}
+        cached = get_gemini_context_cache(self.client, self.model_version, system)
+        if cached:
+            config["cached_content"] = cached
+        elif system:
+            config["system_instruction"] = system
+        if response_schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_json_schema"] = response_schema["schema"]
+        if samples > 1:
+            config["candidate_count"] = samples
+        return {"model": self.model_version, "contents": contents, "config": config}
+
+    def _backoff(self, attempt: int, max_retries: int, error) -> float:
+        wait_time = (2 ** attempt) + random.random()
+        logger.warning(
+            "[%s] %s. Retrying in %.1fs (attempt %d/%d)...",
+            "RateLimit" if isinstance(error, RateLimitError) else type(error).__name__,
+            error, wait_time, attempt + 1, max_retries,
+        )
+        return wait_time
+
+    # ---------- provider requests ----------
+
+    def _stream_done(self, call, messages, text, answer, started):
+        # streamed replies carry no usage block once cancelled, so sizes are estimated
+        call["prompt_tokens"] = estimate_tokens(messages)
+        call["completion_tokens"] = estimate_tokens([{"content": text}])
+        call["streamed"] = True
+        if answer is not None:
+            call["ttfva_s"] = time.perf_counter() - started
+            return answer
+        return text
+
+    def _read_stream(self, call, messages, pieces, parser, started):
+        """Feed streamed text into `parser` and stop at the first valid answer"""
+        text = ""
+        for piece in pieces:
+            text += piece
+            answer = parser(text)
+            if answer is not None:
+                call["stream_cancelled"] = True
+                return self._stream_done(call, messages, text, answer, started)
+        return self._stream_done(call, messages, text, parser(text, final=True), started)
+
+    async def _aread_stream(self, call, messages, pieces, parser, started):
+        text = ""
+        async for piece in pieces:
+            text += piece
+            answer = parser(text)
+            if answer is not None:
+                call["stream_cancelled"] = True
+                return self._stream_done(call, messages, text, answer, started)
+        return self._stream_done(call, messages, text, parser(text, final=True), started)
+
+    @staticmethod
+    def _openai_texts(completion, samples):
+        texts = [choice.message.content for choice in completion.choices]
+        return texts if samples > 1 else texts[0]
+
+    @staticmethod
+    def _gemini_texts(resp, samples):
+        if samples <= 1:
+            return resp.text
+        return [
+            "".join(part.text or "" for part in (c.content.parts if c.content else []))
+            for c in resp.candidates or []
+        ]
+
+    def _vote(self, call: dict, response, vote=None) -> str:
+        """
+        Reduce the samples of a multi-sample call to one answer with `vote(replies)`, which
+        returns (answer, agreement); agreement is recorded on the call as a confidence signal.
+        Without `vote` the most common reply wins. Single replies pass through.
+        """
+        if not isinstance(response, list):
             return response
+        call["samples"] = len(response)
+        if not response:
+            return ""
+        if vote is None:
+            vote = majority_vote(lambda text: text.strip())
+        answer, call["agreement"] = vote(response)
+        return answer
+
+    def _openai_request(self, messages, response_schema=None, samples=1) -> dict:
+        """
+        chat.completions.create kwargs; `response_schema` ({"name", "schema"}) enables strict
+        JSON output and `samples` > 1 asks for that many choices (n).
+        """
+        request = dict(messages=messages, model=self.model_version, **self._params())
+        if response_schema is not None:
+            request["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": response_schema["name"], "schema": response_schema["schema"], "strict": True},
+            }
+        if samples > 1:
+            request["n"] = samples
+        return request
+
+    def _openai_complete(self, call, messages, stream_parser=None, response_schema=None, samples=1):
+        """
+        One OpenAI request; streamed and cut short once `stream_parser` finds an answer.
+        Returns the reply, or a list of replies when `samples` > 1 (never streamed).
+        """
+        request = self._openai_request(messages, response_schema, samples)
+        if stream_parser is None or samples > 1:
+            completion = self.client.chat.completions.create(**request)
+            self._openai_usage(call, completion)
+            return self._openai_texts(completion, samples)
+
+        started = time.perf_counter()
+        stream = self.client.chat.completions.create(stream=True, **request)
+        try:
+            pieces = (c.choices[0].delta.content for c in stream if c.choices and c.choices[0].delta.content)
+            return self._read_stream(call, messages, pieces, stream_parser, started)
+        finally:
+            stream.close()  # drops the connection if the model is still talking
+
+    async def _aopenai_complete(self, call, messages, stream_parser=None, response_schema=None, samples=1):
+        request = self._openai_request(messages, response_schema, samples)
+        if stream_parser is None or samples > 1:
+            completion = await self.async_client.chat.completions.create(**request)
+            self._openai_usage(call, completion)
+            return self._openai_texts(completion, samples)
+
+        started = time.perf_counter()
+        stream = await self.async_client.chat.completions.create(stream=True, **request)
+        try:
+            pieces = (c.choices[0].delta.content async for c in stream if c.choices and c.choices[0].delta.content)
+            return await self._aread_stream(call, messages, pieces, stream_parser, started)
+        finally:
+            await stream.close()
+
+    def _gemini_complete(self, call, messages, stream_parser=None, response_schema=None, samples=1):
+        """One Gemini request; like _openai_complete"""
+        request = self._gemini_request(messages, response_schema, samples)
+        if stream_parser is None or samples > 1:
+            resp = self.client.models.generate_content(**request)
+            self._gemini_usage(call, resp)
+            return self._gemini_texts(resp, samples)
+
+        started = time.perf_counter()
+        stream = self.client.models.generate_content_stream(**request)
+        try:
+            pieces = (r.text for r in stream if r.text)
+            return self._read_stream(call, messages, pieces, stream_parser, started)
+        finally:
+            stream.close()
+
+    async def _agemini_complete(self, call, messages, stream_parser=None, response_schema=None, samples=1):
+        request = self._gemini_request(messages, response_schema, samples)
+        if stream_parser is None or samples > 1:
+            resp = await self.async_client.models.generate_content(**request)
+            self._gemini_usage(call, resp)
+            return self._gemini_texts(resp, samples)
+
+        started = time.perf_counter()
+        stream = await self.async_client.models.generate_content_stream(**request)
+        try:
+            pieces = (r.text async for r in stream if r.text)
+            return await self._aread_stream(call, messages, pieces, stream_parser, started)
+        finally:
+            await stream.aclose()
+
+    def talk_to_ai(self, prompt: str, max_retries: int = 5, step: str = "answer",
+                   stream_parser=None, response_schema=None, samples=1, vote=None,
+                   record_as=None) -> str:
+        """
+        Send a message to the model, with:
+        - optional mock mode (MOCK_GPT=1): legal, seed-reproducible replies read from the
+          prompts, with optional simulated latency (MOCK_GPT_SEED, MOCK_GPT_LATENCY)
+        - proactive pacing by the shared rate limiter (GPT_RATE_LIMITS), with
+          backoff for OpenAI on 429s, dropped connections, timeouts and 5xx (RETRYABLE_ERRORS)
+        - optional reply cache keyed by the full conversation (GPT_CACHE=1)
+        - per-call accounting in self.calls; `step` names the strategy step
+          that issued the call (e.g. "cot_reasoning" vs "guess"); see gpt_stats.py
+        - optional streaming: `stream_parser(text, final)` (see gpt_parsing.py) is fed
+          the reply as it arrives and the request is cancelled at the first valid
+          answer, which becomes the reply; time to that answer is recorded as ttfva_s
+        - optional structured output: `response_schema` ({"name": .., "schema": <JSON schema>})
+          makes the provider return JSON valid against the schema (see gpt_parsing.py)
+        - optional self-consistency: `samples` > 1 draws that many replies in the same request
+          (OpenAI n, Gemini candidate_count) and `vote` reduces them to the returned answer
+        - optional `record_as(reply)`: what the conversation history keeps of the reply, e.g.
+          only the answer of a reasoning + answer reply (see gpt_parsing.strip_reasoning)
+        """
+        call = self._new_call(step)
+        response, cache_key, messages = self._begin(prompt, call, response_schema, samples)
+        if response is not None:
+            time.sleep(call.pop("_mock_delay", 0.0))
+            return self._finish(self._vote(call, response, vote), call, record_as=record_as)
 
         # ---------- OpenAI path ----------
         if self.provider == "openai":
+            reserved = self._request_tokens(messages)
             for attempt in range(max_retries):
                 try:
-                    completion = self.client.chat.completions.create(
-                        messages=self.conversation_history,
-                        model=self.model_version,
-                        max_tokens=512,
-                    )
-                    response = completion.choices[0].message.content
-                    self.conversation_history.append(
-                        {"role": "assistant", "content": response}
-                    )
-                    return response
-
-                except RateLimitError as e:
+                    if self.rate_limiter is not None:
+                        call["queue_wait_s"] += self.rate_limiter.acquire(reserved)
+                    response = self._openai_complete(call, messages, stream_parser, response_schema, samples)
+                    self._settle_rate_limit(call, reserved)
+                    return self._finish(self._vote(call, response, vote), call, cache_key, record_as)
+
+                except RETRYABLE_ERRORS as e:
+                    # the failed request is not billed; the next attempt reserves its tokens again
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.refund(reserved)
                     if attempt == max_retries - 1:
                         raise
-                    wait_time = (2 ** attempt) + random.random()
-                    print(
-                        f"[RateLimit] {e}. "
-                        f"Retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})..."
-                    )
-                    time.sleep(wait_time)
+                    call["retries"] = attempt + 1
+                    time.sleep(self._backoff(attempt, max_retries, e))
 
         # ---------- Gemini path ----------
         if self.provider == "gemini":
-            # Flatten conversation into a single text block
-            history_text = ""
-            for msg in self.conversation_history:
-                role = msg["role"].upper()
-                content = msg["content"]
-                history_text += f"{role}: {content}\n"
-            history_text += "ASSISTANT:"
-
-            resp = self.client.models.generate_content(
-                model=self.model_version,  # e.g. "gemini-2.5-flash"
-                contents=history_text,
-            )
-            response = resp.text
-            self.conversation_history.append(
-                {"role": "assistant", "content": response}
-            )
-            return response
+            reserved = self._request_tokens(messages)
+            if self.rate_limiter is not None:
+                call["queue_wait_s"] += self.rate_limiter.acquire(reserved)
+            response = self._gemini_complete(call, messages, stream_parser, response_schema, samples)
+            self._settle_rate_limit(call, reserved)
+            return self._finish(self._vote(call, response, vote), call, cache_key, record_as)
 
         raise RuntimeError(f"Unsupported provider: {self.provider}")
 
+    async def atalk_to_ai(self, prompt: str, max_retries: int = 5, step: str = "answer",
+                          stream_parser=None, response_schema=None, samples=1, vote=None,
+                          record_as=None) -> str:
+        """
+        Async version of talk_to_ai using the providers' async clients,
+        so many games can wait on the network from one event loop.
+        """
+        call = self._new_call(step)
+        response, cache_key, messages = self._begin(prompt, call, response_schema, samples)
+        if response is not None:
+            await asyncio.sleep(call.pop("_mock_delay", 0.0))
+            return self._finish(self._vote(call, response, vote), call, record_as=record_as)
+
+        # ---------- OpenAI path ----------
+        if self.provider == "openai":
+            reserved = self._request_tokens(messages)
+            for attempt in range(max_retries):
+                try:
+                    if self.rate_limiter is not None:
+                        call["queue_wait_s"] += await self.rate_limiter.aacquire(reserved)
+                    response = await self._aopenai_complete(call, messages, stream_parser, response_schema, samples)
+                    self._settle_rate_limit(call, reserved)
+                    return self._finish(self._vote(call, response, vote), call, cache_key, record_as)
+
+                except RETRYABLE_ERRORS as e:
+                    # the failed request is not billed; the next attempt reserves its tokens again
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.refund(reserved)
+                    if attempt == max_retries - 1:
+                        raise
+                    call["retries"] = attempt + 1
+                    await asyncio.sleep(self._backoff(attempt, max_retries, e))
+
+        # ---------- Gemini path ----------
+        if self.provider == "gemini":
+            reserved = self._request_tokens(messages)
+            if self.rate_limiter is not None:
+                call["queue_wait_s"] += await self.rate_limiter.aacquire(reserved)
+            response = await self._agemini_complete(call, messages, stream_parser, response_schema, samples)
+            self._settle_rate_limit(call, reserved)
+            return self._finish(self._vote(call, response, vote), call, cache_key, record_as)
+
+        raise RuntimeError(f"Unsupported provider: {self.provider}")
+
+
+def _as_request(request, defaults):
+    """
+    Strategy generators yield a prompt string or a dict of talk_to_ai kwargs.
+    Plain prompts get all the driver's defaults (step, stream_parser, ...);
+    dicts only inherit the default step.
+    """
+    if isinstance(request, str):
+        return {"prompt": request, **defaults}
+    return {"step": defaults.get("step", "answer"), **request}
+
+
+def run_steps(manager, steps, **defaults):
+    """
+    Drive a strategy generator synchronously.
+    The generator yields prompts (or dicts of talk_to_ai kwargs) and receives the
+    model's replies; its return value is the final result. `defaults` are
+    talk_to_ai kwargs for the yielded prompts, e.g. step="clue".
+    """
+    response = None
+    try:
+        while True:
+            request = _as_request(steps.send(response), defaults)
+            response = manager.talk_to_ai(**request)
+    except StopIteration as done:
+        return done.value
+
 
+async def arun_steps(manager, steps, **defaults):
+    """Async counterpart of run_steps (awaits GPT.atalk_to_ai)"""
+    response = None
+    try:
+        while True:
+            request = _as_request(steps.send(response), defaults)
+            response = await manager.atalk_to_ai(**request)
+    except StopIteration as done:
+        return done.value
@@ -0,0 +1,173 @@
+import ast
+import json
+import random
+import re
+
+
+# clue words the mock Codemaster picks from (anything derived from / deriving a board word is skipped)
+CLUE_WORDS = [
+    "ANIMAL", "OCEAN", "MUSIC", "MACHINE", "FOREST", "KITCHEN", "CASTLE", "PLANET",
+    "WEATHER", "SPORT", "MONEY", "TRAVEL", "GARDEN", "HISTORY", "ARMY", "BODY",
+    "COLOUR", "FESTIVAL", "JEWEL", "THEATRE", "SCIENCE", "WINTER", "ROYAL", "SCHOOL",
+]
+
+_LIST = re.compile(r"\[[^\[\]]*\]")
+_RED = re.compile(r"Red:\s*(\[[^\[\]]*\])")
+_TARGETS = re.compile(r"target words\s*\{([^}]*)\}")
+_SETS = re.compile(r"\{([^{}]*)\}")
+_CANDIDATES = re.compile(r"Candidate clues[^:]*:(.*)")
+_YOURS = re.compile(r"Your words:\s*([^.]*)\.")
+_BOARD = re.compile(r"Red:\s*\[|target words\s*\{|Candidate clues|remaining words|Remaining words|from this list")
+
+
+class LatencyProfile:
+    """
+    Simulated response time, from a spec such as
+    "fixed:0.2", "uniform:0.1,0.6", "normal:0.4,0.1" or "lognormal:0.4,0.5"
+    (lognormal takes the median in seconds and sigma). "" or "0" means no delay.
+    """
+
+    def __init__(self, spec="0"):
+        self.spec = str(spec or "0").strip().lower()
+        kind, _, args = self.spec.partition(":")
+        if not args:
+            kind, args = "fixed", kind
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a.strip()]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency profile: {spec}")
+
+    def sample(self, rng=random) -> float:
+        if self.kind == "fixed":
+            return self.args[0] if self.args else 0.0
+        if self.kind == "uniform":
+            return rng.uniform(self.args[0], self.args[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.args[0], self.args[1]))
+        median, sigma = self.args
+        return median * rng.lognormvariate(0.0, sigma) if median > 0 else 0.0
+
+
+def _words_in(text):
+    """Board words in the last Python-style list of `text` (the prompts embed str(list))"""
+    for raw in reversed(_LIST.findall(text)):
+        try:
+            words = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(words, list) and all(isinstance(w, str) for w in words):
+            return [w.upper() for w in words]
+    return []
+
+
+def _board_prompt(messages):
+    """Newest user message that lists the board (follow-up prompts refer back to it)"""
+    for m in reversed(messages):
+        if m.get("role") == "user" and _BOARD.search(str(m.get("content", ""))):
+            return str(m["content"])
+    return ""
+
+
+def _legal_clue(board, rng):
+    candidates = [
+        c for c in CLUE_WORDS
+        if not any(w and (c in w or w in c) for w in board)
+    ]
+    return rng.choice(candidates or ["ZEBRA"])
+
+
+def mock_clue(text, rng, candidates=None):
+    """(clue, number) that passes AICodemaster's checks for the board in `text`"""
+    red = []
+    match = _RED.search(text)
+    if match:
+        red = _words_in(match.group(1))
+    else:
+        match = _TARGETS.search(text) or _YOURS.search(text)
+        if match:
+            red = [w.strip().upper() for w in match.group(1).split(",") if w.strip()]
+    board = [w for raw in _LIST.findall(text) for w in _words_in(raw)]
+    board += [w.strip().upper() for group in _SETS.findall(text) for w in group.split(",")]
+    number = rng.randint(1, min(3, len(red))) if red else 1
+    if not candidates:
+        match = _CANDIDATES.search(text)
+        if match:
+            candidates = [c.split("(")[0].strip().upper() for c in match.group(1).split(";")]
+    if candidates:
+        return rng.choice([c for c in candidates if c] or ["ZEBRA"]), number
+    return _legal_clue(board, rng), number
+
+
+def mock_plan(text, rng):
+    """Red words of `text` split into groups of 1-3, each with a different legal clue"""
+    match = _RED.search(text)
+    red = _words_in(match.group(1)) if match else []
+    board = [w for raw in _LIST.findall(text) for w in _words_in(raw)]
+    clues = [c for c in CLUE_WORDS if not any(w and (c in w or w in c) for w in board)]
+    rng.shuffle(red)
+    rng.shuffle(clues)
+    plan = []
+    while red and clues:
+        size = rng.randint(1, min(3, len(red)))
+        plan.append((clues.pop(), red[:size]))
+        red = red[size:]
+    return plan
+
+
+def mock_ranking(text, rng):
+    """Remaining words of `text` in a random order with decreasing confidences"""
+    words = _words_in(text)
+    rng.shuffle(words)
+    confidence = 1.0
+    ranking = []
+    for w in words:
+        confidence = round(confidence * rng.uniform(0.5, 0.95), 2)
+        ranking.append((w, confidence))
+    return ranking
+
+
+def mock_reply(messages, rng=random, response_format=None) -> str:
+    """
+    Legal reply to the newest prompt of a Codemaster/Guesser conversation.
+    The remaining words are read back from the prompts, so guesses are always board words
+    and clues never derive from one; `rng` makes the choice reproducible.
+    `response_format` is the OpenAI-style json_schema request (see GPT._openai_request).
+    """
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+    board_text = _board_prompt(messages)
+
+    schema_name = None
+    reply = {}
+    if response_format and response_format.get("type") == "json_schema":
+        schema_name = response_format["json_schema"]["name"]
+        if "reasoning" in response_format["json_schema"]["schema"]["properties"]:
+            reply["reasoning"] = "Looking for a word that links several of the target words and none of the others."
+    if schema_name == "codenames_clue":
+        enum = response_format["json_schema"]["schema"]["properties"]["clue"].get("enum")
+        clue, number = mock_clue(board_text, rng, enum)
+        return json.dumps({**reply, "clue": clue.lower(), "number": number})
+    if schema_name == "codenames_plan":
+        return json.dumps({"groups": [{"clue": c.lower(), "words": ws} for c, ws in mock_plan(board_text, rng)]})
+    if schema_name == "codenames_ranking":
+        return json.dumps({"ranking": [{"word": w, "confidence": c} for w, c in mock_ranking(board_text, rng)]})
+    if schema_name == "codenames_guess":
+        enum = response_format["json_schema"]["schema"]["properties"]["guess"]["enum"]
+        return json.dumps({**reply, "guess": rng.choice(enum) if enum else ""})
+
+    lowered = prompt.lower()
+    if "'yes' or 'no'" in lowered:
+        return rng.choice(["yes", "no"])
+    if "('pebble'" in lowered or "word: (number)" in lowered:
+        clue, number = mock_clue(board_text, rng)
+        return f"('{clue.lower()}',{number})"
+    if "clue: word1, word2" in lowered:
+        return "\n".join(f"{c}: {', '.join(ws)}" for c, ws in mock_plan(board_text, rng))
+    if "word: confidence" in lowered:
+        return "\n".join(f"{w}: {c}" for w, c in mock_ranking(prompt, rng))
+    if lowered.startswith("evaluate the codenames clue"):
+        return "Feedback: the clue is reasonable and unlikely to point at the other words."
+
+    words = _words_in(prompt) or _words_in(board_text)
+    if words:
+        return rng.choice(words)
+    return "OK"
@@ -0,0 +1,282 @@
+import json
+import re
+from collections import Counter
+
+
+# ('pebble',2) / ("pebble", 2) / (pebble, 2)
+CLUE_PATTERN = re.compile(r"\(\s*['\"]?\s*([A-Za-z][A-Za-z\-]*)\s*['\"]?\s*,\s*(\d+)\s*\)")
+
+
+def clue_parser(text, final=False):
+    """
+    Incremental parser for Codemaster replies: returns the first complete
+    ('word',N) in `text`, or None if there is none (yet).
+    """
+    match = CLUE_PATTERN.search(text)
+    return match.group(0) if match else None
+
+
+def word_parser(words):
+    """
+    Incremental parser for Guesser replies: returns the first board word in the text.
+    While streaming (final=False) a word only counts once the next character shows it
+    has ended, so "CAT" is not taken from a partial "CATERPILLAR".
+    """
+    alternatives = sorted((re.escape(w.upper()) for w in words if w), key=len, reverse=True)
+    if not alternatives:
+        return lambda text, final=False: None
+    pattern = re.compile(r"(?<![A-Z])(" + "|".join(alternatives) + r")(?![A-Z])")
+
+    def parse(text, final=False):
+        upper = text.upper()
+        for match in pattern.finditer(upper):
+            if final or match.end() < len(upper):
+                return match.group(1)
+        return None
+
+    return parse
+
+
+def majority_vote(parse):
+    """
+    Vote for self-consistency sampling (GPT.talk_to_ai(samples=...)): `parse(reply)` maps each
+    sample to an answer or None, and the most common answer wins (ties: first seen).
+    Returns vote(replies) -> (answer, agreement), agreement being the winner's share of all
+    samples; with no parseable sample the first reply is kept with agreement 0.
+    """
+    def vote(replies):
+        answers = [a for a in (parse(r) for r in replies) if a is not None]
+        if not answers:
+            return replies[0], 0.0
+        counts = Counter(answers)
+        answer = max(counts, key=counts.get)    # dicts keep first-seen order, so ties go to it
+        return answer, counts[answer] / len(replies)
+
+    return vote
+
+
+def distinct_answers(parse):
+    """
+    Vote that keeps every sample instead of picking one (parallel candidate generation):
+    returns vote(replies) -> ("; ".join(distinct parsed answers), share of samples that parsed).
+    """
+    def vote(replies):
+        answers = [a for a in (parse(r) for r in replies) if a is not None]
+        if not answers:
+            return "; ".join(r.strip() for r in replies), 0.0
+        return "; ".join(dict.fromkeys(answers)), len(answers) / len(replies)
+
+    return vote
+
+
+# ---------- structured outputs ----------
+
+# JSON schemas in the shape GPT.talk_to_ai(response_schema=...) takes: a name plus the schema.
+# Strict mode needs every property listed as required and no additional properties.
+def clue_schema(candidates=None, reasoning=False):
+    """
+    Clue schema; `candidates` restricts the clue to a shortlist (the "Shortlist" Codemaster),
+    `reasoning` adds a leading "reasoning" field (single-call COT, see with_reasoning).
+    """
+    clue = {"type": "string", "description": "a single word, not derived from a board word"}
+    if candidates:
+        clue["enum"] = list(candidates)
+    schema = {
+        "name": "codenames_clue",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "clue": clue,
+                "number": {"type": "integer", "description": "how many of your words the clue relates to"},
+            },
+            "required": ["clue", "number"],
+            "additionalProperties": False,
+        },
+    }
+    return with_reasoning(schema) if reasoning else schema
+
+
+CLUE_SCHEMA = clue_schema()
+
+
+def guess_schema(words, reasoning=False):
+    """Schema whose only valid replies are the given (remaining) board words"""
+    schema = {
+        "name": "codenames_guess",
+        "schema": {
+            "type": "object",
+            "properties": {"guess": {"type": "string", "enum": [w.upper() for w in words]}},
+            "required": ["guess"],
+            "additionalProperties": False,
+        },
+    }
+    return with_reasoning(schema) if reasoning else schema
+
+
+def with_reasoning(schema):
+    """
+    `schema` with a "reasoning" field in front of the answer fields, so one reply carries the
+    step-by-step reasoning and then the answer (properties are generated in order).
+    """
+    inner = schema["schema"]
+    properties = {"reasoning": {"type": "string", "description": "step-by-step reasoning, written first"}}
+    properties.update(inner["properties"])
+    return {
+        "name": schema["name"],
+        "schema": {**inner, "properties": properties, "required": ["reasoning"] + inner["required"]},
+    }
+
+
+def ranking_schema(words):
+    """Schema for the "Ranked" Guesser: remaining board words, most likely first, with confidences"""
+    return {
+        "name": "codenames_ranking",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "ranking": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "word": {"type": "string", "enum": [w.upper() for w in words]},
+                            "confidence": {"type": "number"},
+                        },
+                        "required": ["word", "confidence"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["ranking"],
+            "additionalProperties": False,
+        },
+    }
+
+
+def plan_schema(words):
+    """Schema for the "Planned" Codemaster: clue groups partitioning the given (red) words"""
+    return {
+        "name": "codenames_plan",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "groups": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "clue": {"type": "string", "description": "a single word, not derived from a board word"},
+                            "words": {"type": "array", "items": {"type": "string", "enum": [w.upper() for w in words]}},
+                        },
+                        "required": ["clue", "words"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["groups"],
+            "additionalProperties": False,
+        },
+    }
+
+
+# CLUE: WORD, WORD / 1. 'clue' - WORD, WORD
+PLAN_LINE = re.compile(r"^[\s\d.)*-]*['\"]?([A-Za-z][A-Za-z\-]*)['\"]?\s*[:=\-]\s*(.+)$", re.MULTILINE)
+
+
+def parse_plan(text, words):
+    """
+    [(clue, [words]), ...] from a plan reply (plan_schema JSON or "CLUE: WORD, WORD" lines),
+    keeping only the given board words, each in at most one group, in the model's order.
+    """
+    board = {w.upper() for w in words}
+    groups = []
+    data = _load_object(text)
+    if data is not None and isinstance(data.get("groups"), list):
+        for item in data["groups"]:
+            if isinstance(item, dict) and isinstance(item.get("words"), list):
+                groups.append((str(item.get("clue", "")), [str(w) for w in item["words"]]))
+    else:
+        groups = [(clue, re.split(r"[,\s]+", rest)) for clue, rest in PLAN_LINE.findall(text or "")]
+
+    plan, used = [], set()
+    for clue, group in groups:
+        group = [w.strip("'\"[]().").upper() for w in group]
+        group = list(dict.fromkeys(w for w in group if w in board and w not in used))
+        if clue and group:
+            plan.append((clue.upper(), group))
+            used.update(group)
+    return plan
+
+
+# WORD: 0.8 / 1. WORD - 0.8 / "WORD" (0.8)
+RANK_LINE = re.compile(r"([A-Za-z][A-Za-z\-]*)['\"]?\s*[:=\-,(]\s*([01](?:\.\d+)?|\.\d+)")
+
+
+def parse_ranking(text, words):
+    """
+    [(word, confidence), ...] from a ranking reply (ranking_schema JSON or "WORD: 0.8" lines),
+    keeping only remaining board words, each once, in the model's order.
+    Words the model left out are appended with confidence 0, so there is always a next candidate.
+    """
+    board = [w.upper() for w in words]
+    pairs = []
+    data = _load_object(text)
+    if data is not None and isinstance(data.get("ranking"), list):
+        for item in data["ranking"]:
+            if isinstance(item, dict):
+                pairs.append((str(item.get("word", "")), item.get("confidence", 0.0)))
+    else:
+        pairs = RANK_LINE.findall(text or "")
+
+    ranking, seen = [], set()
+    for word, confidence in pairs:
+        word = word.upper()
+        if word in board and word not in seen:
+            try:
+                confidence = min(1.0, max(0.0, float(confidence)))
+            except (TypeError, ValueError):
+                confidence = 0.0
+            ranking.append((word, confidence))
+            seen.add(word)
+    ranking += [(w, 0.0) for w in board if w not in seen]
+    return ranking
+
+
+def _load_object(text):
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def strip_reasoning(text):
+    """
+    History form of a with_reasoning reply: the JSON without its "reasoning" field, so later
+    prompts carry the answer but not the reasoning text; anything else is returned as is.
+    """
+    data = _load_object(text)
+    if data is None or "reasoning" not in data:
+        return text
+    data.pop("reasoning")
+    return json.dumps(data)
+
+
+def structured_clue(text):
+    """
+    Turn a CLUE_SCHEMA reply into the usual ('word',N) text, so the existing
+    validation applies unchanged; anything else is returned as is.
+    """
+    data = _load_object(text)
+    if data is None or "clue" not in data or "number" not in data:
+        return text
+    return f"('{data['clue']}',{data['number']})"
+
+
+def structured_guess(text):
+    """Turn a guess_schema reply into the bare word; anything else is returned as is"""
+    data = _load_object(text)
+    if data is None or "guess" not in data:
+        return text
+    return str(data["guess"])
+
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at `per_minute` units per minute, holding at most `capacity`.
+    Reservations may drive the level negative: each caller is handed its own future slot,
+    so concurrent callers are spread out instead of all retrying at the same moment.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = float(per_minute) / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """Take `amount` units; return how long the caller must wait before using them"""
+        self._refill(now)
+        # a single request larger than the bucket can never fit; let it through at full level
+        amount = min(float(amount), self.capacity)
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount, now):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + float(amount))
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider/model"""
+
+    def __init__(self, rpm=None, tpm=None):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        # metrics
+        self.acquired = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def _reserve(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.acquired += 1
+            self.total_wait_s += wait
+            self.max_wait_s = max(self.max_wait_s, wait)
+            return wait
+
+    def acquire(self, tokens=0):
+        """Block until a request of ~`tokens` tokens may be sent; return the queue wait in seconds"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens=0):
+        """Async version of acquire (yields to the event loop while waiting)"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def refund(self, tokens):
+        """Give back tokens that were reserved but not used (estimate above actual usage)"""
+        if self.tokens is not None and tokens > 0:
+            with self._lock:
+                self.tokens.refund(tokens, time.monotonic())
+
+    def stats(self):
+        return {
+            "acquired": self.acquired,
+            "total_wait_s": self.total_wait_s,
+            "max_wait_s": self.max_wait_s,
+            "mean_wait_s": self.total_wait_s / self.acquired if self.acquired else 0.0,
+        }
+
+
+_limits = {}       # "provider:model" -> {"rpm": .., "tpm": ..}
+_limiters = {}     # "provider:model" -> RateLimiter, or None when no limit is configured
+_limiters_lock = threading.Lock()
+_share = 1.0       # fraction of every configured limit this process may use
+
+
+def configure_rate_limit(provider, model="*", rpm=None, tpm=None):
+    """
+    Set the limits for a provider/model ("*" is the default for models of the provider
+    without their own entry; each model still gets its own limiter).
+    Every GPT created afterwards for that model shares one limiter.
+    """
+    key = f"{provider.lower()}:{model}"
+    with _limiters_lock:
+        _limits[key] = {"rpm": rpm, "tpm": tpm}
+        _limiters.pop(key, None)
+        if model == "*":
+            for k in [k for k in _limiters if k.startswith(f"{provider.lower()}:")]:
+                _limiters.pop(k)
+
+
+def set_process_share(share):
+    """
+    Let this process use only `share` of every configured limit. Limiters are per process, so
+    N worker processes (codenames/tournament.py) each take 1/N to stay within the provider's limits.
+    """
+    global _share
+    with _limiters_lock:
+        _share = float(share)
+        _limiters.clear()
+
+
+def _load_env_limits():
+    """GPT_RATE_LIMITS='{"openai:gpt-4o-2024-05-13": {"rpm": 500, "tpm": 30000}, "gemini:*": {"rpm": 15}}'"""
+    raw = os.getenv("GPT_RATE_LIMITS")
+    return json.loads(raw) if raw else {}
+
+
+def get_limiter(provider, model):
+    """Process-wide limiter for provider/model, or None when no limit is configured"""
+    provider = provider.lower()
+    key = f"{provider}:{model}"
+    with _limiters_lock:
+        if key in _limiters:
+            return _limiters[key]
+        limits = {**_load_env_limits(), **_limits}
+        config = limits.get(key) or limits.get(f"{provider}:*")
+        if not config or not (config.get("rpm") or config.get("tpm")):
+            _limiters[key] = None   # remembered, so GPT_RATE_LIMITS is parsed once per key
+        else:
+            rpm, tpm = (config.get(k) and config[k] * _share for k in ("rpm", "tpm"))
+            _limiters[key] = RateLimiter(rpm=rpm, tpm=tpm)
+        return _limiters[key]
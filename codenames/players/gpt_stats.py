@@ -0,0 +1,37 @@
+def summarize_calls(calls) -> dict:
+    """Aggregate GPT.calls records: totals plus a per-step breakdown"""
+    summary = {
+        "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "latency_s": 0.0, "retries": 0, "queue_wait_s": 0.0, "cache_hits": 0, "tokens_saved": 0,
+        "streamed": 0, "stream_cancelled": 0, "ttfva_s": 0.0, "samples": 0,
+        "steps": {},
+    }
+    for call in calls:
+        summary["calls"] += 1
+        summary["prompt_tokens"] += call["prompt_tokens"]
+        summary["completion_tokens"] += call["completion_tokens"]
+        summary["latency_s"] += call["latency_s"]
+        summary["retries"] += call["retries"]
+        summary["queue_wait_s"] += call.get("queue_wait_s", 0.0)
+        summary["cache_hits"] += call["source"] == "cache"
+        summary["tokens_saved"] += call["tokens_saved"]
+        summary["streamed"] += call.get("streamed", False)
+        summary["stream_cancelled"] += call.get("stream_cancelled", False)
+        summary["ttfva_s"] += call.get("ttfva_s") or 0.0
+        summary["samples"] += call.get("samples", 1)
+
+        step = summary["steps"].setdefault(
+            call["step"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_s": 0.0}
+        )
+        step["calls"] += 1
+        step["prompt_tokens"] += call["prompt_tokens"]
+        step["completion_tokens"] += call["completion_tokens"]
+        step["latency_s"] += call["latency_s"]
+
+    # time to first valid answer is only known for streamed calls that produced one
+    answered = [c["ttfva_s"] for c in calls if c.get("ttfva_s") is not None]
+    summary["mean_ttfva_s"] = summary["ttfva_s"] / len(answered) if answered else None
+    # agreement among self-consistency samples, a confidence signal for the voted answers
+    agreements = [c["agreement"] for c in calls if c.get("agreement") is not None]
+    summary["mean_agreement"] = sum(agreements) / len(agreements) if agreements else None
+    return summary
@@ -1,9 +1,17 @@
+import logging
 import os
 import random
-from codenames.players.gpt_manager import game_rules, GPT
+from codenames.players.gpt_manager import game_rules, GPT, run_steps, arun_steps
+from codenames.players.gpt_parsing import (
+    guess_schema, majority_vote, parse_ranking, ranking_schema, strip_reasoning, structured_guess,
+    word_parser,
+)
 from codenames.players.guesser import Guesser
 
 
+logger = logging.getLogger(__name__)
+
+
 class AIGuesser(Guesser):
     """
     Guesser that uses GPT.
@@ -11,18 +19,46 @@ class AIGuesser(Guesser):
     - "Default"
     - "Cautious"
     - "Risky"
-    - "COT"  (chain-of-thought, 2-step)
+    - "COT"  (chain-of-thought: 2-step, or one reasoning + answer call with cot_mode="single")
     - "Self Refine"
     - "Solo Performance"
+    Guesser-only:
+    - "Ranked"  (one call per clue ranks the remaining words with confidences;
+                 guesses then walk that list and keep_guessing is a local threshold check)
+    - "Self Consistency"  (`samples` guesses drawn in one request and majority-voted;
+                           the share agreeing with the winner is kept as its confidence)
     """
 
 
-    def __init__(self, team: str = "Red", strategy: str = "Default"):
+    def __init__(self, team: str = "Red", strategy: str = "Default", history=None, stream=None,
+                 structured=None, rank_threshold=None, samples=None, cot_mode=None):
         super().__init__()
         self.team = team
         self.strategy = strategy
+        # stream guesses and stop as soon as a board word has been produced
+        self.stream = os.getenv("GPT_STREAM") == "1" if stream is None else stream
+        # constrain guesses to JSON picking from the remaining board words
+        self.structured = os.getenv("GPT_STRUCTURED") == "1" if structured is None else structured
+        # final guess replies parsed / rejected as invalid (see Game.llm_stats)
+        self.answers = 0
+        self.invalid_answers = 0
+        # "COT": "two-step" (reasoning call, then an answer call) or "single" (see AICodemaster)
+        self.cot_mode = (cot_mode or os.getenv("GPT_COT_MODE", "two-step")).strip().lower()
+        # "Ranked": [(word, confidence), ...] for the current clue, and the confidence
+        # the next candidate needs for keep_guessing to say yes
+        self.ranking = None
+        if rank_threshold is None:
+            rank_threshold = os.getenv("GPT_RANK_THRESHOLD", "0.5")
+        self.rank_threshold = float(rank_threshold)
+        # "Self Consistency": samples per guess request, and the agreement of the last vote
+        if samples is None:
+            samples = os.getenv("GPT_SAMPLES", "5")
+        self.samples = int(samples)
+        self.agreement = None
         self.num = 0
         self.guesses = 0
+        # fallback picks; Game replaces it with a generator seeded from the game
+        self.rng = random.Random()
 
         system_prompt = (
             game_rules
@@ -42,6 +78,7 @@ class AIGuesser(Guesser):
             system_prompt=system_prompt,
             version=model,
             provider=provider,
+            history=history,
         )
 
 
@@ -55,8 +92,10 @@ class AIGuesser(Guesser):
         self.clue = clue
         self.num = int(num)
         self.guesses = 0
+        self.ranking = None
+        self.manager.new_turn()
         # we keep the strategy from __init__, but you could also pass it per-turn here
-        print("The clue is:", clue, num)
+        logger.debug("The clue is: %s %s", clue, num)
         return [clue, num]
 
     # ---------------- helpers ----------------
@@ -76,8 +115,25 @@ class AIGuesser(Guesser):
         """
         Different prompt-engineering styles for deciding whether to keep guessing.
         """
+        return run_steps(self.manager, self._keep_guessing_steps(), step="keep_guessing")
+
+    async def akeep_guessing(self):
+        """Async version of keep_guessing"""
+        return await arun_steps(self.manager, self._keep_guessing_steps(), step="keep_guessing")
+
+    def _keep_guessing_steps(self):
+        """Generator shared by keep_guessing/akeep_guessing: yields prompts, returns bool"""
         label = str(getattr(self, "strategy", "Default")).strip().lower()
 
+        # ranked: decided locally from the confidences of this clue's ranking
+        if label == "ranked":
+            candidate = self._next_ranked()
+            return (
+                candidate is not None
+                and (self.guesses < self.num or self.num == 0)
+                and candidate[1] >= self.rank_threshold
+            )
+
         # hard stop for cautious: guess at most 1 word per turn
         if label == "cautious":
             return self.guesses < 1
@@ -122,7 +178,7 @@ class AIGuesser(Guesser):
                     + "Would you like to keep guessing? Answer only 'yes' or 'no'. "
                 )
 
-            response = self.manager.talk_to_ai(prompt)
+            response = yield prompt
             if isinstance(response, str) and "yes" in response.lower():
                 return True
             if isinstance(response, str) and "no" in response.lower():
@@ -141,7 +197,29 @@ class AIGuesser(Guesser):
         """
         Different prompt-engineering styles for choosing the next word.
         """
+        return run_steps(self.manager, self._answer_steps(), step="guess", **self._answer_options())
+
+    async def aget_answer(self):
+        """Async version of get_answer"""
+        return await arun_steps(self.manager, self._answer_steps(), step="guess", **self._answer_options())
+
+    def _answer_options(self):
+        """
+        talk_to_ai kwargs for the final guess prompts (intermediate steps are left alone).
+        A schema-constrained reply is already just the answer, so it is not streamed.
+        """
+        if self.structured:
+            return {"response_schema": guess_schema(self.get_remaining_options())}
+        if self.stream:
+            return {"stream_parser": word_parser(self.get_remaining_options())}
+        return {}
+
+    def _answer_steps(self):
+        """Generator shared by get_answer/aget_answer: yields prompts, returns the guessed word"""
         label = str(getattr(self, "strategy", "Default")).strip().lower()
+        if label == "ranked":
+            return (yield from self._ranked_answer_steps())
+
         invalid_timer = 0
         guess = None
 
@@ -157,7 +235,7 @@ class AIGuesser(Guesser):
                     + "Return ONLY the word, no extra text."
                 )
 
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
             # ---------- CAUTIOUS ----------
             elif label == "cautious":
@@ -169,7 +247,7 @@ class AIGuesser(Guesser):
                     + "If multiple words are possible, pick the one with the strongest and most obvious link. "
                     + "Return ONLY the word."
                 )
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
             # ---------- RISKY ----------
             elif label == "risky":
@@ -180,7 +258,23 @@ class AIGuesser(Guesser):
                     + "Pick the word that is MOST LIKELY intended, even if there is a bit of risk. "
                     + "Return ONLY the word."
                 )
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
+
+            # ---------- CHAIN OF THOUGHT (single call) ----------
+            elif label == "cot" and self.cot_mode == "single":
+                prompt = (
+                    "We are playing Codenames.\n"
+                    f"Clue: ({self.clue}, {self.num}).\n"
+                    f"Remaining words: {remaining}.\n"
+                    "Think step by step about which remaining word best matches the clue: "
+                    "write your reasoning first, then the single final guess word."
+                )
+                response = yield {
+                    "prompt": prompt,
+                    "response_schema": guess_schema(remaining, reasoning=True),
+                    "record_as": strip_reasoning,
+                }
+                response = structured_guess(response)
 
             # ---------- CHAIN OF THOUGHT ----------
             elif label == "cot":
@@ -193,14 +287,14 @@ class AIGuesser(Guesser):
                     "List the top 3 candidates and score them 0–1.\n"
                     "Do NOT output the final guess yet."
                 )
-                _ = self.manager.talk_to_ai(reasoning_prompt)
+                _ = yield {"prompt": reasoning_prompt, "step": "cot_reasoning"}
 
                 # step 2: final
                 prompt = (
                     f"Now give me ONLY the single final guess word for the clue ({self.clue}, {self.num}) "
                     f"from this list: {remaining}. Return ONLY the word."
                 )
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
             # ---------- SELF REFINE ----------
             elif label in {"self refine", "self-refine", "self_refine"}:
@@ -210,7 +304,7 @@ class AIGuesser(Guesser):
                     + f"The Codemaster's clue is: ({self.clue}, {self.num}). "
                     + "Pick the most likely word. Return ONLY the word."
                 )
-                initial_guess = self.manager.talk_to_ai(initial_prompt)
+                initial_guess = yield {"prompt": initial_prompt, "step": "initial_guess"}
 
                 critique_prompt = (
                     f"You guessed: {initial_guess}. "
@@ -219,7 +313,7 @@ class AIGuesser(Guesser):
                     "If the guess is risky, suggest a safer one from the remaining words. "
                     "Return ONLY the final safest word."
                 )
-                response = self.manager.talk_to_ai(critique_prompt)
+                response = yield critique_prompt
 
             # ---------- SOLO PERFORMANCE ----------
             elif label in {"solo performance", "solo-performance", "solo_performance"}:
@@ -229,7 +323,29 @@ class AIGuesser(Guesser):
                     f"Remaining words: {remaining}. "
                     "Internally do the reasoning, but output ONLY the final chosen word."
                 )
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
+
+            # ---------- SELF CONSISTENCY ----------
+            elif label in {"self consistency", "self-consistency", "self_consistency"}:
+                prompt = (
+                    "The remaining words are: " + str(remaining) + ". "
+                    + f"The Codemaster's clue is: ({self.clue}, {self.num}). "
+                    + "Select ONE of the remaining words that is MOST associated with this clue. "
+                    + "Return ONLY the word, no extra text."
+                )
+                # all samples come from one request and are voted on; no second call
+                parse = word_parser(remaining)
+                request = {
+                    "prompt": prompt,
+                    "samples": self.samples,
+                    "vote": majority_vote(lambda text: parse(structured_guess(text), final=True)),
+                }
+                if self.structured:
+                    request["response_schema"] = guess_schema(remaining)
+                response = yield request
+                self.agreement = self.manager.calls[-1].get("agreement") if self.manager.calls else None
+                if self.agreement is not None:
+                    logger.info("Self-consistency: %s (%.0f%% of %d samples agree)", response, 100 * self.agreement, self.samples)
 
             # ---------- fallback ----------
             else:
@@ -239,11 +355,14 @@ class AIGuesser(Guesser):
                     + "Select one of the remaining words that is most associated with this clue. "
                     + "You must select one of the remaining words and provide no additional text."
                 )
-                response = self.manager.talk_to_ai(prompt)
+                response = yield prompt
 
             # ---------- parse ----------
             if not isinstance(response, str):
                 response = str(response)
+            if self.structured:
+                response = structured_guess(response)
+            self.answers += 1
 
             candidate = response.strip().upper()
 
@@ -260,11 +379,49 @@ class AIGuesser(Guesser):
                 guess = response.split("'")[1].upper()
             # too many bad tries → pick random
             elif invalid_timer > 10:
-                print("You have made too many invalid guesses, selecting random remaining word")
-                guess = random.choice(remaining)
+                self.invalid_answers += 1
+                logger.warning("Too many invalid guesses, selecting a random remaining word")
+                guess = self.rng.choice(remaining)
             else:
-                print("Warning! Invalid guess from model:", candidate)
+                logger.warning("Invalid guess from model: %s", candidate)
+                self.invalid_answers += 1
                 invalid_timer += 1
 
         self.guesses += 1
         return guess
+
+    # ---------------- ranked candidates ----------------
+
+    def _next_ranked(self):
+        """Highest-ranked (word, confidence) that is still on the board, or None"""
+        remaining = set(self.get_remaining_options())
+        for word, confidence in self.ranking or []:
+            if word in remaining:
+                return word, confidence
+        return None
+
+    def _ranked_answer_steps(self):
+        """One ranking call on the first guess of a turn; later guesses reuse it"""
+        remaining = self.get_remaining_options()
+        if self.ranking is None:
+            prompt = (
+                "The remaining words are: " + str(remaining) + ". "
+                + f"The Codemaster's clue is: ({self.clue}, {self.num}). "
+                + "Rank the remaining words from most to least likely to be intended by this clue. "
+                + "Give every word a confidence between 0 and 1 that it is your team's word. "
+                + "Return one word per line in the format WORD: confidence, best first, with no other text."
+            )
+            request = {"prompt": prompt, "step": "rank"}
+            if self.structured:
+                request["response_schema"] = ranking_schema(remaining)
+            response = yield request
+            self.ranking = parse_ranking(response, remaining)
+            self.answers += 1
+            if not any(confidence > 0 for _, confidence in self.ranking):
+                self.invalid_answers += 1
+                logger.warning("Could not read a ranking from the model: %s", response)
+
+        candidate = self._next_ranked()
+        guess = candidate[0] if candidate else self.rng.choice(remaining)
+        self.guesses += 1
+        return guess
@@ -0,0 +1,122 @@
+import re
+
+import numpy as np
+
+from codenames.players.codemaster import Codemaster
+from codenames.players.vectors import CM_WORDLIST, candidate_matrix, embed, vector_sources
+
+
+class VectorCodemaster(Codemaster):
+    """
+    Embedding Codemaster (no API calls): every clue word in cm_wordlist.txt is scored against
+    all remaining board words with one matrix product per turn.
+
+    A red word counts for a clue when it is within `distance_threshold` (cosine distance) of it,
+    closer than every Blue and Civilian word, and closer than the Assassin by at least
+    `assassin_margin`. The clue covering the most red words (at most `max_red_words_per_clue`)
+    wins, ties broken by how much closer its weakest covered red word is than the nearest
+    other word. A clue word can be given again at most `same_clue_patience` times.
+    """
+
+    def __init__(self, team="Red", vectors=None, glove_vecs=None, word_vectors=None,
+                 distance_threshold=0.7, same_clue_patience=1, max_red_words_per_clue=3,
+                 assassin_margin=0.1, wordlist=CM_WORDLIST, **kwargs):
+        super().__init__()
+        self.team = team
+        self.sources = vector_sources(vectors, glove_vecs, word_vectors)
+        self.distance_threshold = float(distance_threshold)
+        self.same_clue_patience = int(same_clue_patience)
+        self.max_red_words_per_clue = int(max_red_words_per_clue)
+        self.assassin_margin = float(assassin_margin)
+
+        self.clue_words, self.clue_matrix = candidate_matrix(self.sources, wordlist)
+        # lookups for the "derived from / derives a board word" rule
+        self._clue_text = "\n".join(self.clue_words)
+        self._clue_ends = np.cumsum([len(w) + 1 for w in self.clue_words])
+        self._clue_index = {w: i for i, w in enumerate(self.clue_words)}
+        self.times_given = np.zeros(len(self.clue_words), dtype=np.int32)
+        self.words = []
+        self.maps = []
+
+    def set_game_state(self, words, maps):
+        self.words = words
+        self.maps = maps
+
+    def _remaining(self):
+        """(board words, roles) of the words not yet revealed"""
+        pairs = [(w, m) for w, m in zip(self.words, self.maps) if w and w[0] != "*"]
+        return [w for w, _ in pairs], np.array([m for _, m in pairs])
+
+    def _legal(self, board):
+        """Mask of clue words not derived from / deriving a board word, and not used up"""
+        blocked = self.times_given > self.same_clue_patience
+        for w in (w.lower() for w in board):
+            # board word inside the clue: search the joined list once, map hits back to clues
+            hits = [m.start() for m in re.finditer(re.escape(w), self._clue_text)]
+            blocked[np.searchsorted(self._clue_ends, hits, side="right")] = True
+            for sub in {w[i:j] for i in range(len(w)) for j in range(i + 1, len(w) + 1)}:
+                if sub in self._clue_index:                          # clue inside the board word
+                    blocked[self._clue_index[sub]] = True
+        return ~blocked
+
+    def score_clues(self):
+        """
+        Per clue word: number of red words it safely covers and the tie-break margin.
+        Returns (counts, margins, legal) arrays aligned with self.clue_words.
+        """
+        board, roles = self._remaining()
+        board_matrix, _ = embed(board, self.sources)
+        # (clues x board) cosine similarities in one product
+        sims = self.clue_matrix @ board_matrix.T
+
+        red = roles == self.team
+        assassin = roles == "Assassin"
+        others = ~red & ~assassin
+        n = len(self.clue_words)
+        red_sims = -np.sort(-sims[:, red], axis=1)     # best red first
+        other_max = sims[:, others].max(axis=1) if others.any() else np.full(n, -1.0)
+        assassin_max = sims[:, assassin].max(axis=1) if assassin.any() else np.full(n, -1.0)
+
+        bar = np.maximum(other_max, assassin_max + self.assassin_margin)
+        safe = (red_sims > bar[:, None]) & (red_sims >= 1.0 - self.distance_threshold)
+        # red_sims is sorted, so the safe entries are a prefix and their sum is the count
+        counts = np.minimum(safe.sum(axis=1), self.max_red_words_per_clue)
+
+        k = np.maximum(counts, 1)
+        weakest = np.take_along_axis(red_sims, (k - 1)[:, None], axis=1)[:, 0] if red.any() else np.zeros(n)
+        margins = weakest - bar
+        return counts, margins, self._legal(board)
+
+    def shortlist(self, k=10):
+        """
+        Best `k` legal clues, best first, as (clue, count, red words it covers).
+        Also the candidate list the hybrid LLM Codemaster chooses from.
+        """
+        counts, margins, legal = self.score_clues()
+        if not legal.any():
+            legal[:] = True
+        # most red words first, then the widest margin
+        order = np.lexsort((-margins, -counts))
+        best = order[legal[order]][:k]
+
+        board, roles = self._remaining()
+        red_words = [w for w, r in zip(board, roles) if r == self.team]
+        red_matrix, _ = embed(red_words, self.sources)
+        sims = self.clue_matrix[best] @ red_matrix.T
+        result = []
+        for row, i in enumerate(best):
+            count = int(max(counts[i], 1))
+            covered = [red_words[j] for j in np.argsort(-sims[row])[:count]]
+            result.append((self.clue_words[i], count, covered))
+        return result
+
+    def mark_given(self, clue):
+        """Count `clue` against same_clue_patience"""
+        i = self._clue_index.get(str(clue).lower())
+        if i is not None:
+            self.times_given[i] += 1
+
+    def get_clue(self):
+        clue, count, _ = self.shortlist(1)[0]
+        self.mark_given(clue)
+        return [clue, count]
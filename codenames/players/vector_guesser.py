@@ -0,0 +1,76 @@
+import logging
+
+import numpy as np
+
+from codenames.players.guesser import Guesser
+from codenames.players.vectors import embed, vector_sources
+
+
+logger = logging.getLogger(__name__)
+
+
+class VectorGuesser(Guesser):
+    """
+    Embedding Guesser (no API calls): remaining board words are ranked by cosine similarity
+    to the clue, using a normalised board matrix built once per game.
+
+    keep_guessing says yes while fewer than N words have been picked, the next candidate is
+    at least `min_similarity` to the clue, and it beats the word ranked after it by at least
+    `gap_threshold` (a candidate that does not stand out from the rest is probably not meant).
+    """
+
+    def __init__(self, team="Red", vectors=None, glove_vecs=None, word_vectors=None,
+                 gap_threshold=0.02, min_similarity=0.25, **kwargs):
+        super().__init__()
+        self.team = team
+        self.sources = vector_sources(vectors, glove_vecs, word_vectors)
+        self.gap_threshold = float(gap_threshold)
+        self.min_similarity = float(min_similarity)
+
+        self.words = []
+        self.clue = None
+        self.num = 0
+        self.guesses = 0
+        self._clue_vector = None
+        self._board_words = []          # words of the board matrix, in row order
+        self._board_matrix = None
+        self._row = {}
+
+    def set_board(self, words):
+        self.words = words
+        remaining = [w for w in words if w and w[0] != "*"]
+        # the board only shrinks during a game, so the matrix is only built for a new board
+        if any(w not in self._row for w in remaining):
+            self._board_words = remaining
+            self._board_matrix, _ = embed(remaining, self.sources)
+            self._row = {w: i for i, w in enumerate(remaining)}
+
+    def set_clue(self, clue, num):
+        self.clue = clue
+        self.num = int(num)
+        self.guesses = 0
+        self._clue_vector = embed([str(clue)], self.sources)[0][0]
+        logger.debug("The clue is: %s %s", clue, num)
+        return [clue, num]
+
+    def ranked(self):
+        """Remaining words and their similarity to the clue, best first"""
+        remaining = [w for w in self.words if w and w[0] != "*"]
+        rows = np.fromiter((self._row[w] for w in remaining), dtype=np.intp, count=len(remaining))
+        sims = self._board_matrix[rows] @ self._clue_vector
+        order = np.argsort(-sims, kind="stable")
+        return [remaining[i] for i in order], sims[order]
+
+    def get_answer(self):
+        words, _ = self.ranked()
+        self.guesses += 1
+        return words[0]
+
+    def keep_guessing(self):
+        if self.num and self.guesses >= self.num:
+            return False
+        words, sims = self.ranked()
+        if not words or sims[0] < self.min_similarity:
+            return False
+        gap = sims[0] - sims[1] if len(sims) > 1 else sims[0]
+        return bool(gap >= self.gap_threshold)
@@ -0,0 +1,268 @@
+import argparse
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+CM_WORDLIST = Path(__file__).with_name("cm_wordlist.txt")
+
+
+def vector_sources(vectors=None, glove_vecs=None, word_vectors=None):
+    """
+    Embedding sources for the vector agents, in the kwargs the game already passes:
+    `vectors` (a list, as in simple_example.py) or glove_vecs / word_vectors (run_game.py).
+    A source is anything with `word in source` and `source[word]`: the dict from
+    Game.load_glove_vecs or the KeyedVectors from Game.load_w2v.
+    """
+    if vectors is not None:
+        sources = list(vectors) if isinstance(vectors, (list, tuple)) else [vectors]
+    else:
+        sources = [v for v in (word_vectors, glove_vecs) if v is not None]
+    if not sources:
+        raise ValueError("The vector agents need word vectors: pass vectors=[...], glove_vecs or word_vectors")
+    return sources
+
+
+def embed(words, sources):
+    """
+    Unit-length embeddings of `words` as one float32 matrix, plus a mask of the words
+    found in every source. Each source is normalised and the parts are concatenated and
+    scaled by 1/sqrt(#sources), so a dot product is the mean cosine over the sources
+    (a word missing from one source contributes 0 for it).
+    """
+    words = [w.lower() for w in words]
+    parts = []
+    found = np.ones(len(words), dtype=bool)
+    for source in sources:
+        dim = _dimension(source)
+        part = np.zeros((len(words), dim), dtype=np.float32)
+        for i, w in enumerate(words):
+            if w in source:
+                part[i] = source[w]
+            else:
+                found[i] = False
+        norms = np.linalg.norm(part, axis=1, keepdims=True)
+        np.divide(part, norms, out=part, where=norms > 0)
+        parts.append(part)
+    matrix = np.hstack(parts) / np.sqrt(len(sources))
+    return matrix.astype(np.float32, copy=False), found
+
+
+def _dimension(source):
+    if hasattr(source, "vector_size"):   # gensim KeyedVectors
+        return source.vector_size
+    return len(next(iter(source.values())))
+
+
+@lru_cache(maxsize=None)
+def load_clue_words(path=CM_WORDLIST):
+    """Candidate clue words (one per line)"""
+    with open(path, encoding="utf-8") as f:
+        return tuple(line.strip().lower() for line in f if line.strip())
+
+
+_candidate_cache = {}   # (ids of sources, path) -> (sources, words, matrix)
+
+
+def candidate_matrix(sources, path=CM_WORDLIST):
+    """
+    (words, matrix) for the clue words found in every source, built once per set of sources,
+    so every game sharing loaded vectors shares the same matrix.
+    """
+    key = (tuple(id(s) for s in sources), str(path))
+    cached = _candidate_cache.get(key)
+    # ids can be reused after a source is freed; the cache keeps its own references to check
+    if cached is not None and all(a is b for a, b in zip(cached[0], sources)):
+        return cached[1], cached[2]
+
+    words = load_clue_words(path)
+    matrix, found = embed(words, sources)
+    words = [w for w, ok in zip(words, found) if ok]
+    matrix = np.ascontiguousarray(matrix[found])
+    _candidate_cache[key] = (list(sources), words, matrix)
+    return words, matrix
+
+
+class EmbeddingTable:
+    """
+    Word vectors as one float32 (or float16) matrix plus a sorted vocabulary array (row i is the
+    vector of words[i]), usable anywhere a glove dict / KeyedVectors is: `word in table`, `table[word]`.
+
+    Saved tables (save()) are two .npy files that load() memory-maps read-only, so every process
+    that attaches to the same files shares one copy in the OS page cache instead of holding its
+    own: memory stays flat as workers are added. Lookups are a binary search over the
+    memory-mapped vocabulary, so no per-process index is built either.
+    """
+
+    def __init__(self, words, matrix):
+        self.words = words
+        self.matrix = matrix
+        self.vector_size = matrix.shape[1]
+
+    @classmethod
+    def from_vectors(cls, vectors, dtype=np.float32):
+        """Table from a glove dict, gensim KeyedVectors (Game.load_w2v) or another table"""
+        if isinstance(vectors, EmbeddingTable):
+            return cls(vectors.words, np.asarray(vectors.matrix, dtype=dtype))
+        if hasattr(vectors, "index_to_key"):
+            return cls.from_arrays(list(vectors.index_to_key), vectors.vectors, dtype)
+        keys = list(vectors)
+        matrix = np.stack([np.asarray(vectors[k]) for k in keys]) if keys else np.zeros((0, 0))
+        return cls.from_arrays(keys, matrix, dtype)
+
+    @classmethod
+    def from_arrays(cls, keys, matrix, dtype=np.float32):
+        """Table from words and their rows; a word listed twice keeps its last row, as a dict would"""
+        encoded = np.array([k.encode("utf-8") for k in keys], dtype=bytes)
+        # unique over the reversed list: sorted vocabulary, first hit = last occurrence
+        words, first = np.unique(encoded[::-1], return_index=True)
+        rows = len(encoded) - 1 - first
+        return cls(words, np.ascontiguousarray(np.asarray(matrix)[rows], dtype=dtype))
+
+    @staticmethod
+    def files(base):
+        """(vocabulary, matrix) file names of a saved table"""
+        base = str(base)
+        return base + ".vocab.npy", base + ".vectors.npy"
+
+    def save(self, base):
+        """Write the table next to `base`; each file is written to a temp name and renamed into place"""
+        for path, array in zip(self.files(base), (self.words, self.matrix)):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, base, mmap=True):
+        """Attach to a saved table (memory-mapped, read-only, zero-copy unless mmap=False)"""
+        mode = "r" if mmap else None
+        vocab_file, matrix_file = cls.files(base)
+        return cls(np.load(vocab_file, mmap_mode=mode), np.load(matrix_file, mmap_mode=mode))
+
+    @classmethod
+    def exists(cls, base):
+        return all(os.path.exists(f) for f in cls.files(base))
+
+    @classmethod
+    def is_fresh(cls, base, source):
+        """A saved table at `base` that is not older than the `source` file it was converted from"""
+        if not cls.exists(base):
+            return False
+        source_mtime = os.path.getmtime(source)
+        return all(os.path.getmtime(f) >= source_mtime for f in cls.files(base))
+
+    def _row(self, word):
+        key = word.encode("utf-8")
+        i = int(np.searchsorted(self.words, key))
+        if i < len(self.words) and self.words[i] == key:
+            return i
+        return None
+
+    def __contains__(self, word):
+        return self._row(word) is not None
+
+    def __getitem__(self, word):
+        i = self._row(word)
+        if i is None:
+            raise KeyError(word)
+        return self.matrix[i]
+
+    def get(self, word, default=None):
+        i = self._row(word)
+        return default if i is None else self.matrix[i]
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return (w.decode("utf-8") for w in self.words)
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return iter(self.matrix)
+
+    def items(self):
+        return zip(self, self.matrix)
+
+
+def read_glove(path, dtype=np.float32):
+    """Parse a GloVe text file straight into an EmbeddingTable (one numpy conversion per line)"""
+    keys, rows = [], []
+    with open(path, encoding="utf-8") as infile:
+        for line in infile:
+            word, _, numbers = line.rstrip().partition(" ")
+            keys.append(word)
+            rows.append(np.array(numbers.split(" "), dtype=np.float32))
+    matrix = np.stack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+    return EmbeddingTable.from_arrays(keys, matrix, dtype)
+
+
+def cache_enabled():
+    """Binary vector caches are on unless CODENAMES_VECTOR_CACHE=0"""
+    return os.getenv("CODENAMES_VECTOR_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def cached_glove(path, dtype=np.float32):
+    """
+    GloVe vectors from the binary cache next to `path` (<path>.vocab.npy / <path>.vectors.npy),
+    memory-mapped. The text file is parsed and converted the first time, or again when it is newer
+    than the cache; when the cache cannot be written the parsed table is returned in memory.
+    """
+    if EmbeddingTable.is_fresh(path, path):
+        return EmbeddingTable.load(path)
+    logger.info("converting %s to a binary vector cache (one time)", path)
+    table = read_glove(path, dtype)
+    try:
+        table.save(path)
+    except OSError as e:
+        logger.warning("could not write the vector cache for %s: %s", path, e)
+        return table
+    return EmbeddingTable.load(path)
+
+
+def shared_table(path, loader, shared_dir):
+    """
+    The vectors in `path` as a memory-mapped EmbeddingTable, converted with `loader(path)`
+    (e.g. Game.load_glove_vecs) the first time and again when `path` is newer than the table.
+    The binary cache Game.load_glove_vecs keeps next to a GloVe file is used as is; other
+    vectors are saved under `shared_dir`. Convert in the parent process before starting
+    workers, so each worker only attaches.
+    """
+    if EmbeddingTable.is_fresh(path, path):
+        return EmbeddingTable.load(path)
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    base = Path(shared_dir) / f"{Path(path).name}-{digest}"
+    if not EmbeddingTable.is_fresh(base, path):
+        if EmbeddingTable.exists(base):
+            logger.info("%s changed since it was converted, converting it again", path)
+        vectors = loader(path)
+        if EmbeddingTable.is_fresh(path, path):   # the loader wrote its own cache
+            return EmbeddingTable.load(path)
+        Path(shared_dir).mkdir(parents=True, exist_ok=True)
+        EmbeddingTable.from_vectors(vectors).save(base)
+    return EmbeddingTable.load(base)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert GloVe text files to the binary cache Game.load_glove_vecs memory-maps")
+    parser.add_argument("paths", nargs="+", help="GloVe .txt files")
+    parser.add_argument("--float16", action="store_true", help="store half-precision vectors (half the size)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    dtype = np.float16 if args.float16 else np.float32
+    for path in args.paths:
+        read_glove(path, dtype).save(path)
+        logger.info("wrote %s", ", ".join(EmbeddingTable.files(path)))
+
+
+if __name__ == "__main__":
+    main()
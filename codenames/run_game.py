@@ -1,13 +1,78 @@
 import sys
 import importlib
 import argparse
+import logging
 import time
 import os
 
 from codenames.game import Game
+from codenames.players.vectors import shared_table
 from codenames.players.guesser import *
 from codenames.players.codemaster import *
 
+logger = logging.getLogger(__name__)
+
+
+def load_resources(w2v=None, glove=None, wordnet=None, glove_cm=None, glove_guesser=None, shared_dir=None):
+    """
+    Load the word vectors / wordnet named on the command line.
+    Returns (cm_kwargs, g_kwargs) for the Codemaster and Guesser; files used by both are loaded once.
+    With `shared_dir` the vectors are memory-mapped EmbeddingTables kept in that directory
+    (converted on first use), which all processes loading them share.
+    """
+    g_kwargs = {}
+    cm_kwargs = {}
+    loaded = {}
+
+    def load(path, loader):
+        if shared_dir is not None:
+            return shared_table(path, loader, shared_dir)
+        return loader(path)
+
+    def glove_vecs(path):
+        if path not in loaded:
+            loaded[path] = load(path, Game.load_glove_vecs)
+            logger.info('loaded glove vectors')
+        return loaded[path]
+
+    if wordnet is not None:
+        brown_ic = Game.load_wordnet(wordnet)
+        g_kwargs["brown_ic"] = brown_ic
+        cm_kwargs["brown_ic"] = brown_ic
+        logger.info('loaded wordnet')
+
+    if glove is not None:
+        g_kwargs["glove_vecs"] = cm_kwargs["glove_vecs"] = glove_vecs(glove)
+
+    if w2v is not None:
+        w2v_vectors = load(w2v, Game.load_w2v)
+        g_kwargs["word_vectors"] = w2v_vectors
+        cm_kwargs["word_vectors"] = w2v_vectors
+        logger.info('loaded word vectors')
+
+    if glove_cm is not None:
+        cm_kwargs["glove_vecs"] = glove_vecs(glove_cm)
+
+    if glove_guesser is not None:
+        g_kwargs["glove_vecs"] = glove_vecs(glove_guesser)
+
+    return cm_kwargs, g_kwargs
+
+
+def import_string_to_class(import_string):
+    """Parse an import string (A.B.C.MyClass, relative to the codenames package) and return the class"""
+    parts = import_string.split('.')
+    module_name = '.'.join(parts[:len(parts) - 1])
+    class_name = parts[-1]
+
+    # --- FIX: prefix with 'codenames.' so dynamic imports work ---
+    if not module_name.startswith("codenames."):
+        module_name = f"codenames.{module_name}"
+
+    module = importlib.import_module(module_name)
+    my_class = getattr(module, class_name)
+    return my_class
+
 class GameRun:
     """Class that builds and runs a Game based on command line arguments"""
 
@@ -26,16 +91,15 @@ class GameRun:
         parser.add_argument("--glove_guesser", help="Path to glove file or None", default=None)
 
         parser.add_argument("--no_log", help="Supress logging", action='store_true', default=False)
-        parser.add_argument("--no_print", help="Supress printing", action='store_true', default=False)
+        parser.add_argument("--no_print", help="Supress board rendering and info messages", action='store_true', default=False)
         parser.add_argument("--game_name", help="Name of game in log", default="default")
 
         args = parser.parse_args()
 
         self.do_log = not args.no_log
         self.do_print = not args.no_print
-        if not self.do_print:
-            self._save_stdout = sys.stdout
-            sys.stdout = open(os.devnull, 'w')
+        # game and agent messages go through logging; --no_print keeps only warnings
+        logging.basicConfig(level=logging.INFO if self.do_print else logging.WARNING, format="%(message)s")
         self.game_name = args.game_name
 
         self.g_kwargs = {}
@@ -44,48 +108,25 @@ class GameRun:
         # load codemaster class
         if args.codemaster == "human":
             self.codemaster = HumanCodemaster
-            print('human codemaster')
+            logger.info('human codemaster')
         else:
             self.codemaster = self.import_string_to_class(args.codemaster)
-            print('loaded codemaster class')
+            logger.info('loaded codemaster class')
 
         # load guesser class
         if args.guesser == "human":
             self.guesser = HumanGuesser
-            print('human guesser')
+            logger.info('human guesser')
         else:
             self.guesser = self.import_string_to_class(args.guesser)
-            print('loaded guesser class')
+            logger.info('loaded guesser class')
 
         # if the game is going to have an ai, load up word vectors
         if sys.argv[1] != "human" or sys.argv[2] != "human":
-            if args.wordnet is not None:
-                brown_ic = Game.load_wordnet(args.wordnet)
-                self.g_kwargs["brown_ic"] = brown_ic
-                self.cm_kwargs["brown_ic"] = brown_ic
-                print('loaded wordnet')
-
-            if args.glove is not None:
-                glove_vectors = Game.load_glove_vecs(args.glove)
-                self.g_kwargs["glove_vecs"] = glove_vectors
-                self.cm_kwargs["glove_vecs"] = glove_vectors
-                print('loaded glove vectors')
-
-            if args.w2v is not None:
-                w2v_vectors = Game.load_w2v(args.w2v)
-                self.g_kwargs["word_vectors"] = w2v_vectors
-                self.cm_kwargs["word_vectors"] = w2v_vectors
-                print('loaded word vectors')
-
-            if args.glove_cm is not None:
-                glove_vectors = Game.load_glove_vecs(args.glove_cm)
-                self.cm_kwargs["glove_vecs"] = glove_vectors
-                print('loaded glove vectors')
-
-            if args.glove_guesser is not None:
-                glove_vectors = Game.load_glove_vecs(args.glove_guesser)
-                self.g_kwargs["glove_vecs"] = glove_vectors
-                print('loaded glove vectors')
+            self.cm_kwargs, self.g_kwargs = load_resources(
+                w2v=args.w2v, glove=args.glove, wordnet=args.wordnet,
+                glove_cm=args.glove_cm, glove_guesser=args.glove_guesser,
+            )
 
         # set seed so that board/keygrid can be reloaded later
         if args.seed == 'time':
@@ -93,25 +134,9 @@ class GameRun:
         else:
             self.seed = int(args.seed)
 
-    def __del__(self):
-        """reset stdout if using the do_print==False option"""
-        if not self.do_print:
-            sys.stdout.close()
-            sys.stdout = self._save_stdout
-
     def import_string_to_class(self, import_string):
         """Parse an import string and return the class"""
-        parts = import_string.split('.')
-        module_name = '.'.join(parts[:len(parts) - 1])
-        class_name = parts[-1]
-
-        # --- FIX: prefix with 'codenames.' so dynamic imports work ---
-        if not module_name.startswith("codenames."):
-            module_name = f"codenames.{module_name}"
-
-        module = importlib.import_module(module_name)
-        my_class = getattr(module, class_name)
-        return my_class
+        return import_string_to_class(import_string)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""
+Tournament runner: plays a grid of (Codemaster, Guesser, kwargs, seed) games in a pool of
+worker processes, in-process instead of one `python run_game.py ...` per game.
+
+Every worker loads the word vectors / wordnet once (run_game.load_resources) and then plays
+games headless; results stream back as games finish and are appended to the results log
+(bot_results.jsonl) by the parent process, so workers never write the file concurrently.
+With --shared-dir the vectors are converted once to memory-mapped tables that every worker
+attaches to, so memory does not grow with the number of workers. Rate limits (GPT_RATE_LIMITS)
+are split evenly between the workers, so together they stay within the configured rpm/tpm.
+A game that raises is logged and reported as a row with an "error" field; the grid goes on.
+
+Run from the repository root:
+    python -m codenames.tournament players.codemaster_gpt.AICodemaster players.guesser_gpt.AIGuesser --seeds 0-49 --jobs 8
+    python -m codenames.tournament players.vector_codemaster.VectorCodemaster players.vector_guesser.VectorGuesser \\
+        --glove players/glove/glove.6B.300d.txt --seeds 100:1600:50 --jobs 16 --shared-dir players/shared
+    python -m codenames.tournament players.codemaster_gpt.AICodemaster players.guesser_gpt.AIGuesser \\
+        --cm-kwargs '{"strategy": "COT"}' '{"strategy": "Self Refine"}' --seeds 0-9
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from codenames.game import LOG_PATH, Game
+from codenames.players.gpt_ratelimit import set_process_share
+from codenames.run_game import import_string_to_class, load_resources
+
+logger = logging.getLogger(__name__)
+
+
+def expand_grid(codemasters, guessers, seeds, cm_kwargs_grid=({},), g_kwargs_grid=({},), game_name="default"):
+    """
+    One job per combination of Codemaster, Guesser, Codemaster kwargs, Guesser kwargs and seed.
+    Agents are import strings as for run_game.py (e.g. players.codemaster_gpt.AICodemaster) and the
+    kwargs must be picklable (strategy names, thresholds, ...); word vectors come from the workers.
+    """
+    return [
+        {"codemaster": cm, "guesser": g, "cm_kwargs": dict(cm_kw), "g_kwargs": dict(g_kw),
+         "seed": seed, "game_name": game_name}
+        for cm, g, cm_kw, g_kw, seed in itertools.product(codemasters, guessers, cm_kwargs_grid, g_kwargs_grid, seeds)
+    ]
+
+
+# ---------- worker side ----------
+
+_resources = None   # (cm_kwargs, g_kwargs) loaded once per worker process
+
+
+def _init_worker(resources, limit_share=1.0):
+    global _resources
+    # each process has its own rate limiters; together the workers use the configured limits once
+    set_process_share(limit_share)
+    _resources = load_resources(**(resources or {}))
+
+
+def play_job(job):
+    """Play one job headless in this process and return its result record"""
+    if _resources is None:
+        _init_worker(None)
+    cm_resources, g_resources = _resources
+    game = Game(
+        import_string_to_class(job["codemaster"]),
+        import_string_to_class(job["guesser"]),
+        seed=job["seed"], do_print=False, do_log=False, game_name=job.get("game_name", "default"),
+        cm_kwargs={**cm_resources, **job.get("cm_kwargs", {})},
+        g_kwargs={**g_resources, **job.get("g_kwargs", {})},
+    )
+    game.run()
+    return game.results()
+
+
+# ---------- parent side ----------
+
+def run_tournament(job_list, jobs=None, resources=None, log=True, max_pending=None, shared_dir=None):
+    """
+    Play `job_list` (see expand_grid) on `jobs` worker processes (default: CPU count) and yield
+    each result record as its game finishes, in completion order. `resources` holds the
+    load_resources arguments every worker loads once (w2v, glove, wordnet, glove_cm,
+    glove_guesser). With `log` each record is appended to the results log as it arrives.
+    A game that raises yields an error row (the job's identifiers and "error") instead, which
+    is not logged; the other games go on. Each worker gets 1/jobs of the configured rate limits.
+    With `shared_dir` the vectors are converted there once, before the pool starts, and the
+    workers memory-map them (see players/vectors.py EmbeddingTable).
+    jobs=1 plays in this process, which is handy for debugging.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if shared_dir is not None:
+        resources = {**(resources or {}), "shared_dir": shared_dir}
+        if jobs > 1:
+            load_resources(**resources)   # convert here, so the workers only attach
+    if jobs == 1:
+        _init_worker(resources)
+        for job in job_list:
+            try:
+                results = play_job(job)
+            except Exception as e:
+                yield _error_row(job, e)
+            else:
+                yield _record(results, log)
+        return
+
+    # keep a bounded number of games submitted, so huge grids do not all sit in the queue
+    max_pending = max_pending or 4 * jobs
+    pending = {}   # future -> job
+    job_iter = iter(job_list)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(resources, 1.0 / jobs)) as pool:
+        while True:
+            for job in itertools.islice(job_iter, max_pending - len(pending)):
+                pending[pool.submit(play_job, job)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    yield _error_row(job, e)
+                else:
+                    yield _record(results, log)
+
+
+def _error_row(job, exc):
+    """Row for a game that raised: the job's identifiers plus the error"""
+    logger.error("game %s vs %s seed=%s failed: %r", job["codemaster"], job["guesser"], job["seed"], exc)
+    return {**job, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _record(results, log):
+    if log:
+        LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(results, ensure_ascii=False) + "\n")
+    return results
+
+
+def parse_seeds(specs):
+    """Seeds from "7", "0-49" (inclusive) or "100:1600:50" (range) specs"""
+    seeds = []
+    for spec in specs:
+        if ":" in spec:
+            seeds.extend(range(*(int(p) for p in spec.split(":"))))
+        elif "-" in spec.lstrip("-"):
+            start, end = spec.split("-", 1)
+            seeds.extend(range(int(start), int(end) + 1))
+        else:
+            seeds.append(int(spec))
+    return seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("codemasters", help="comma-separated import strings of form A.B.C.MyClass")
+    parser.add_argument("guessers", help="comma-separated import strings of form A.B.C.MyClass")
+    parser.add_argument("--seeds", nargs="+", default=["0-9"], help='seeds: "7", "0-49" or "100:1600:50"')
+    parser.add_argument("--cm-kwargs", nargs="+", default=["{}"], help="JSON kwargs per Codemaster variant")
+    parser.add_argument("--g-kwargs", nargs="+", default=["{}"], help="JSON kwargs per Guesser variant")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (each gets 1/jobs of the GPT_RATE_LIMITS rpm/tpm)")
+    parser.add_argument("--shared-dir", default=None,
+                        help="directory of memory-mapped vector tables shared by all workers (created on first use)")
+
+    parser.add_argument("--w2v", help="Path to w2v file or None", default=None)
+    parser.add_argument("--glove", help="Path to glove file or None", default=None)
+    parser.add_argument("--wordnet", help="Name of wordnet file or None, most like ic-brown.dat", default=None)
+    parser.add_argument("--glove_cm", help="Path to glove file or None", default=None)
+    parser.add_argument("--glove_guesser", help="Path to glove file or None", default=None)
+
+    parser.add_argument("--no_log", help="Do not append results to the results log", action='store_true', default=False)
+    parser.add_argument("--game_name", help="Name of games in log", default="default")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    job_list = expand_grid(
+        args.codemasters.split(","), args.guessers.split(","), parse_seeds(args.seeds),
+        [json.loads(k) for k in args.cm_kwargs], [json.loads(k) for k in args.g_kwargs],
+        game_name=args.game_name,
+    )
+    resources = {"w2v": args.w2v, "glove": args.glove, "wordnet": args.wordnet,
+                 "glove_cm": args.glove_cm, "glove_guesser": args.glove_guesser}
+
+    started = time.time()
+    wins = failed = 0
+    results = run_tournament(job_list, args.jobs, resources, log=not args.no_log, shared_dir=args.shared_dir)
+    for n, r in enumerate(results, 1):
+        if "error" in r:
+            failed += 1
+            print(f"[{n}/{len(job_list)}] {r['codemaster']} vs {r['guesser']} seed={r['seed']} failed: {r['error']}")
+            continue
+        won = r["R"] == 8
+        wins += won
+        print(f"[{n}/{len(job_list)}] {r['codemaster']} vs {r['guesser']} seed={r['seed']} "
+              f"{'won' if won else 'lost'} in {r['total_turns']} turns "
+              f"(R={r['R']} B={r['B']} C={r['C']} A={r['A']}, {r['time_s']:.2f}s)")
+    elapsed = time.time() - started
+    print(f"{len(job_list)} games, {wins} won, {failed} failed, {elapsed:.1f}s on {args.jobs} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import pytest
+
+from codenames.game_state import ASSASSIN, BLUE, CIVILIAN, RED, ROLES, GameState
+
+WORDS = ["APPLE", "BANK", "CAT", "DOG", "EGG"]
+KEY = ["Red", "Red", "Blue", "Civilian", "Assassin"]
+
+
+@pytest.fixture
+def state():
+    return GameState.from_board(WORDS, KEY)
+
+
+def test_from_board_with_shared_vocabulary():
+    vocab = ["ZEBRA"] + WORDS[::-1]
+    state = GameState.from_board(WORDS, KEY, vocab=vocab)
+    assert list(state.words()) == WORDS
+    assert state.ids.tolist() == [5, 4, 3, 2, 1]
+
+
+def test_reveal_updates_bitmask_and_counters(state):
+    assert state.reveal(0) == RED
+    assert state.is_revealed(0) and not state.is_revealed(1)
+    assert state.counts == [1, 0, 0, 0]
+    assert state.remaining(RED) == 1
+    # revealing twice counts once
+    state.reveal(0)
+    assert state.counts[RED] == 1
+    assert state.reveal(4) == ASSASSIN
+
+
+def test_counts_from_initial_bitmask(state):
+    restored = GameState(state.vocab, state.ids, state.roles, revealed=0b01100)
+    assert restored.counts[BLUE] == 1 and restored.counts[CIVILIAN] == 1
+
+
+def test_index(state):
+    assert state.index("CAT") == 2
+    with pytest.raises(ValueError):
+        state.index("ZEBRA")
+
+
+def test_fork_is_independent(state):
+    state.reveal(0)
+    fork = state.fork()
+    fork.reveal(1)
+    assert state.counts[RED] == 1 and fork.counts[RED] == 2
+    assert not state.is_revealed(1)
+    assert fork.ids is state.ids
+
+
+def test_board_view_is_live_and_list_like(state):
+    board = state.words()
+    state.reveal(2)
+    assert board == ["APPLE", "BANK", "*Blue*", "DOG", "EGG"]
+    assert repr(board) == repr(["APPLE", "BANK", "*Blue*", "DOG", "EGG"])
+    assert board[-1] == "EGG" and board[1:3] == ["BANK", "*Blue*"]
+    with pytest.raises(IndexError):
+        board[5]
+    with pytest.raises(TypeError):
+        board[0] = "X"
+
+
+def test_board_view_count_contains_index(state):
+    board = state.words()
+    state.reveal(0)
+    state.reveal(1)
+    assert "APPLE" not in board and "BANK" not in board and "CAT" in board
+    assert board.count("*Red*") == 2 and board.count("*Blue*") == 0
+    assert board.count("ZEBRA") == 0
+    assert board.index("DOG") == 3
+    assert board.index("*Red*") == 0
+    with pytest.raises(ValueError):
+        board.index("APPLE")
+
+
+def test_key_view(state):
+    key = state.key()
+    assert key == KEY
+    assert key.count("Red") == 2
+    assert [ROLES[r] for r in state.roles] == KEY
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from codenames.players import gpt_clients
+from codenames.players.gpt_clients import get_client, get_gemini_context_cache
+
+
+class SlowCaches:
+    """Stand-in for genai client.caches whose create takes a while"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.created = 0
+
+    def create(self, model, config):
+        time.sleep(self.delay)
+        self.created += 1
+        return type("Cached", (), {"name": f"cachedContents/{self.created}"})()
+
+
+class FakeGenaiClient:
+    def __init__(self, delay=0.0):
+        self.caches = SlowCaches(delay)
+
+
+def test_context_cache_create_does_not_block_client_getters(monkeypatch):
+    monkeypatch.setenv("GEMINI_CONTEXT_CACHE", "1")
+    monkeypatch.setattr(gpt_clients, "_context_caches", {})
+    monkeypatch.setattr(gpt_clients, "_context_locks", {})
+    client = FakeGenaiClient(delay=0.5)
+    creating = threading.Thread(target=get_gemini_context_cache, args=(client, "gemini-x", "rules"))
+    creating.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    get_client("openai", "test-key")
+    assert time.perf_counter() - started < 0.3
+    creating.join()
+
+
+def test_context_cache_is_created_once_per_key(monkeypatch):
+    monkeypatch.setenv("GEMINI_CONTEXT_CACHE", "1")
+    monkeypatch.setattr(gpt_clients, "_context_caches", {})
+    monkeypatch.setattr(gpt_clients, "_context_locks", {})
+    client = FakeGenaiClient(delay=0.05)
+    names = []
+    threads = [
+        threading.Thread(target=lambda: names.append(get_gemini_context_cache(client, "gemini-x", "rules")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert client.caches.created == 1
+    assert set(names) == {"cachedContents/1"}
+
+
+def test_context_cache_off_by_default(monkeypatch):
+    monkeypatch.delenv("GEMINI_CONTEXT_CACHE", raising=False)
+    assert get_gemini_context_cache(FakeGenaiClient(), "gemini-x", "rules") is None
@@ -0,0 +1,79 @@
+import pytest
+
+from codenames.players.gpt_history import (
+    FullHistory, LastTurnsHistory, PinnedBoardHistory, SlidingWindowHistory, estimate_tokens, make_history_policy,
+)
+
+
+def conversation(turns, reply_last=True):
+    """system prompt + (user, assistant) pairs; the last reply is left out unless reply_last"""
+    history = [{"role": "system", "content": "s"}]
+    for i in range(1, turns + 1):
+        history.append({"role": "user", "content": f"u{i}"})
+        history.append({"role": "assistant", "content": f"a{i}"})
+    return history if reply_last else history[:-1]
+
+
+def contents(messages):
+    return [m["content"] for m in messages]
+
+
+def test_full_history_sends_everything():
+    history = conversation(3, reply_last=False)
+    assert FullHistory().select(history) == history
+
+
+@pytest.mark.parametrize("size", range(1, 9))
+def test_window_never_starts_with_a_reply(size):
+    selected = SlidingWindowHistory(size).select(conversation(4, reply_last=False))
+    assert selected[0]["role"] == "system"
+    assert selected[1]["role"] == "user"
+    assert selected[-1]["content"] == "u4"
+
+
+def test_window_keeps_system_prompt_and_last_messages():
+    selected = SlidingWindowHistory(6).select(conversation(4, reply_last=False))
+    assert contents(selected) == ["s", "u2", "a2", "u3", "a3", "u4"]
+
+
+def test_last_turns_start_at_turn_boundaries():
+    history = conversation(4, reply_last=False)
+    turn_starts = [1, 3, 5, 7]
+    assert contents(LastTurnsHistory(2).select(history, turn_starts)) == ["s", "u3", "a3", "u4"]
+    assert contents(PinnedBoardHistory().select(history, turn_starts)) == ["s", "u4"]
+    # fewer turns than asked for: everything
+    assert LastTurnsHistory(5).select(history, turn_starts) == history
+
+
+def test_token_budget_drops_oldest_without_dangling_reply():
+    history = conversation(10, reply_last=False)
+    budget = estimate_tokens(history[:1] + history[-3:])
+    selected = FullHistory(token_budget=budget).select(history)
+    assert estimate_tokens(selected) <= budget
+    assert selected[0]["role"] == "system"
+    assert selected[1]["role"] == "user"
+    assert selected[-1]["content"] == "u10"
+
+
+def test_token_budget_keeps_newest_message_even_if_too_large():
+    history = conversation(2, reply_last=False)
+    assert contents(FullHistory(token_budget=1).select(history)) == ["s", "u2"]
+
+
+def test_make_history_policy_specs():
+    assert isinstance(make_history_policy("full"), FullHistory)
+    window = make_history_policy("window:8", token_budget=500)
+    assert isinstance(window, SlidingWindowHistory)
+    assert (window.max_messages, window.token_budget) == (8, 500)
+    assert make_history_policy("turns:3").turns == 3
+    assert isinstance(make_history_policy("pinned"), PinnedBoardHistory)
+    with pytest.raises(ValueError):
+        make_history_policy("everything")
+
+
+def test_make_history_policy_reads_env(monkeypatch):
+    monkeypatch.setenv("GPT_HISTORY", "window:4")
+    monkeypatch.setenv("GPT_TOKEN_BUDGET", "2000")
+    policy = make_history_policy()
+    assert isinstance(policy, SlidingWindowHistory)
+    assert (policy.max_messages, policy.token_budget) == (4, 2000)
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from codenames.players.gpt_parsing import (
+    clue_parser, distinct_answers, majority_vote, parse_plan, parse_ranking, strip_reasoning,
+    structured_clue, structured_guess, word_parser,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("My clue is ('pebble',2) because", "('pebble',2)"),
+    ('("river", 3)', '("river", 3)'),
+    ("(ocean, 1) then ('sky',2)", "(ocean, 1)"),
+    ("thinking about ('peb", None),
+    ("no clue here", None),
+])
+def test_clue_parser(text, expected):
+    assert clue_parser(text) == expected
+
+
+def test_word_parser_waits_for_the_word_to_end_while_streaming():
+    parse = word_parser(["cat", "caterpillar", "dog"])
+    assert parse("I pick CAT") is None
+    assert parse("I pick CAT", final=True) == "CAT"
+    assert parse("I pick CATERP") is None
+    assert parse("I pick caterpillar.") == "CATERPILLAR"
+    assert parse("dogma is no board word", final=True) is None
+
+
+def test_word_parser_without_words():
+    assert word_parser([])("CAT", final=True) is None
+
+
+def test_majority_vote_picks_most_common_answer():
+    vote = majority_vote(lambda r: r.strip().upper() or None)
+    assert vote(["cat", "dog", "Cat", "", "dog", "cat"]) == ("CAT", 0.5)
+
+
+def test_majority_vote_ties_go_to_first_seen():
+    vote = majority_vote(lambda r: r)
+    assert vote(["dog", "cat", "cat", "dog"]) == ("dog", 0.5)
+
+
+def test_majority_vote_keeps_first_reply_when_nothing_parses():
+    vote = majority_vote(lambda r: None)
+    assert vote(["first", "second"]) == ("first", 0.0)
+
+
+def test_distinct_answers_joins_unique_answers_in_order():
+    vote = distinct_answers(clue_parser)
+    replies = ["('river',2)", "junk", "('river',2)", "('bank',3)"]
+    assert vote(replies) == ("('river',2); ('bank',3)", 0.75)
+
+
+def test_parse_plan_lines_keep_board_words_once():
+    words = ["river", "bank", "money", "tree"]
+    text = "1. WATER: river, bank\n2. CASH: money, bank, ghost\n3. NOTHING: ghost"
+    assert parse_plan(text, words) == [("WATER", ["RIVER", "BANK"]), ("CASH", ["MONEY"])]
+
+
+def test_parse_plan_json():
+    text = json.dumps({"groups": [{"clue": "forest", "words": ["tree", "Bank"]}, {"clue": "x", "words": []}]})
+    assert parse_plan(text, ["TREE", "BANK"]) == [("FOREST", ["TREE", "BANK"])]
+
+
+def test_parse_ranking_lines_clamps_and_fills_missing_words():
+    words = ["cat", "dog", "bird"]
+    text = "1. DOG: 0.9\n2. cat - 1.0\n3. dog: 0.1\n4. fish: 0.5"
+    assert parse_ranking(text, words) == [("DOG", 0.9), ("CAT", 1.0), ("BIRD", 0.0)]
+
+
+def test_parse_ranking_json():
+    text = json.dumps({"ranking": [{"word": "bird", "confidence": 2}, {"word": "cat", "confidence": "n/a"}]})
+    assert parse_ranking(text, ["cat", "bird"]) == [("BIRD", 1.0), ("CAT", 0.0)]
+
+
+def test_structured_replies():
+    assert structured_clue('{"clue": "river", "number": 2}') == "('river',2)"
+    assert structured_clue("('river',2)") == "('river',2)"
+    assert structured_guess('{"guess": "CAT"}') == "CAT"
+    assert structured_guess("CAT") == "CAT"
+
+
+def test_strip_reasoning():
+    reply = json.dumps({"reasoning": "long", "guess": "CAT"})
+    assert json.loads(strip_reasoning(reply)) == {"guess": "CAT"}
+    assert strip_reasoning("plain text") == "plain text"
@@ -0,0 +1,160 @@
+import httpx
+import pytest
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from codenames.players import gpt_ratelimit
+from codenames.players.gpt_manager import GPT
+from codenames.players.gpt_ratelimit import (
+    RateLimiter, TokenBucket, configure_rate_limit, get_limiter, set_process_share,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits(monkeypatch):
+    """Each test starts with no configured limits, no limiters and the whole share"""
+    monkeypatch.delenv("GPT_RATE_LIMITS", raising=False)
+    monkeypatch.setattr(gpt_ratelimit, "_limits", {})
+    monkeypatch.setattr(gpt_ratelimit, "_limiters", {})
+    monkeypatch.setattr(gpt_ratelimit, "_share", 1.0)
+
+
+def test_bucket_starts_full_and_spreads_reservations():
+    bucket = TokenBucket(per_minute=60)    # one unit per second
+    t0 = bucket.updated
+    assert bucket.reserve(60, now=t0) == 0.0
+    # empty: each further unit waits one more second
+    assert bucket.reserve(1, now=t0) == pytest.approx(1.0)
+    assert bucket.reserve(1, now=t0) == pytest.approx(2.0)
+
+
+def test_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    t0 = bucket.updated
+    bucket.reserve(10, now=t0)
+    bucket.reserve(0, now=t0 + 5)
+    assert bucket.level == pytest.approx(5.0)
+    bucket.reserve(0, now=t0 + 100)
+    assert bucket.level == pytest.approx(10.0)
+
+
+def test_bucket_oversized_request_passes_at_full_level():
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    assert bucket.reserve(500, now=bucket.updated) == 0.0
+    assert bucket.level == pytest.approx(0.0)
+
+
+def test_bucket_refund_never_exceeds_capacity():
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    bucket.reserve(4, now=bucket.updated)
+    bucket.refund(100, now=bucket.updated)
+    assert bucket.level == pytest.approx(10.0)
+
+
+def test_limiter_waits_for_the_tighter_bucket(monkeypatch):
+    monkeypatch.setattr(gpt_ratelimit.time, "monotonic", lambda: 1000.0)
+    limiter = RateLimiter(rpm=600, tpm=60)
+    assert limiter._reserve(60) == 0.0
+    # plenty of requests left, but the token bucket is empty for 30 tokens -> 30 s
+    assert limiter._reserve(30) == pytest.approx(30.0)
+    assert limiter.stats()["acquired"] == 2
+    assert limiter.stats()["max_wait_s"] == pytest.approx(30.0)
+
+
+def test_limiter_refund_returns_unused_tokens(monkeypatch):
+    monkeypatch.setattr(gpt_ratelimit.time, "monotonic", lambda: 1000.0)
+    limiter = RateLimiter(tpm=100)
+    limiter._reserve(100)
+    limiter.refund(40)
+    assert limiter.tokens.level == pytest.approx(40.0)
+
+
+def test_get_limiter_is_shared_and_falls_back_to_provider_default():
+    configure_rate_limit("openai", rpm=100)
+    configure_rate_limit("openai", "gpt-4o", tpm=5000)
+    assert get_limiter("openai", "gpt-4o") is get_limiter("OpenAI", "gpt-4o")
+    assert get_limiter("openai", "gpt-4o").tokens is not None
+    other = get_limiter("openai", "gpt-4o-mini")
+    assert other is not get_limiter("openai", "gpt-4o")
+    assert other.requests is not None and other.tokens is None
+
+
+def test_get_limiter_remembers_no_limit(monkeypatch):
+    reads = []
+    monkeypatch.setattr(gpt_ratelimit, "_load_env_limits", lambda: reads.append(1) or {})
+    assert get_limiter("gemini", "gemini-1.5-flash") is None
+    assert get_limiter("gemini", "gemini-1.5-flash") is None
+    assert len(reads) == 1
+    # configuring the provider forgets the remembered "no limit"
+    configure_rate_limit("gemini", rpm=15)
+    assert get_limiter("gemini", "gemini-1.5-flash") is not None
+
+
+def test_get_limiter_reads_env(monkeypatch):
+    monkeypatch.setenv("GPT_RATE_LIMITS", '{"gemini:*": {"rpm": 15}}')
+    limiter = get_limiter("gemini", "gemini-1.5-flash")
+    assert limiter.requests.rate * 60 == pytest.approx(15)
+
+
+def test_process_share_divides_the_limits():
+    configure_rate_limit("openai", rpm=60, tpm=1000)
+    set_process_share(0.25)
+    limiter = get_limiter("openai", "gpt-4o")
+    assert limiter.requests.rate * 60 == pytest.approx(15)
+    assert limiter.tokens.capacity == pytest.approx(250)
+
+
+def rate_limit_error():
+    response = httpx.Response(429, request=httpx.Request("POST", "http://test/v1/chat/completions"))
+    return RateLimitError("429 Too Many Requests", response=response, body=None)
+
+
+def test_rejected_attempts_are_counted_and_refunded(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("MOCK_GPT", raising=False)
+    monkeypatch.delenv("GPT_CACHE", raising=False)
+    configure_rate_limit("openai", tpm=100_000)
+    gpt = GPT("system", "gpt-4o")
+    failures = [rate_limit_error() for _ in range(3)]
+
+    def complete(call, messages, *args):
+        if failures:
+            raise failures.pop()
+        return "('river',2)"
+
+    monkeypatch.setattr(gpt, "_openai_complete", complete)
+    monkeypatch.setattr(gpt, "_backoff", lambda *args: 0.0)
+    assert gpt.talk_to_ai("clue?") == "('river',2)"
+    assert gpt.calls[-1]["retries"] == 3
+    # only the successful attempt's reservation is still taken (sizes are unknown here)
+    reserved = gpt._request_tokens(gpt.conversation_history[:2])
+    assert gpt.rate_limiter.tokens.level == pytest.approx(100_000 - reserved, abs=5)
+
+
+def test_dropped_connections_and_server_errors_are_retried(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("MOCK_GPT", raising=False)
+    monkeypatch.delenv("GPT_CACHE", raising=False)
+    gpt = GPT("system", "gpt-4o")
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+    failures = [
+        APITimeoutError(request),
+        APIConnectionError(request=request),
+        InternalServerError("502 Bad Gateway", response=httpx.Response(502, request=request), body=None),
+    ]
+
+    def complete(call, messages, *args):
+        if failures:
+            raise failures.pop()
+        return "CAT"
+
+    monkeypatch.setattr(gpt, "_openai_complete", complete)
+    monkeypatch.setattr(gpt, "_backoff", lambda *args: 0.0)
+    assert gpt.talk_to_ai("guess?") == "CAT"
+    assert gpt.calls[-1]["retries"] == 3
+
+
+def test_clients_leave_retries_to_talk_to_ai(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    gpt = GPT("system", "gpt-4o", shared_client=False)
+    assert gpt.client.max_retries == 0
+    assert gpt.async_client.max_retries == 0
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pytest
+
+from codenames.players.vectors import EmbeddingTable, cached_glove, embed, read_glove, shared_table
+
+
+def write_glove(path, rows):
+    path.write_text("".join(f"{w} {' '.join(str(x) for x in v)}\n" for w, v in rows), encoding="utf-8")
+
+
+def age(path, seconds):
+    """Make `path` look `seconds` older"""
+    t = os.path.getmtime(path) - seconds
+    os.utime(path, (t, t))
+
+
+def test_from_arrays_sorts_and_keeps_last_duplicate():
+    table = EmbeddingTable.from_arrays(["dog", "cat", "dog"], [[1, 0], [0, 1], [2, 2]])
+    assert list(table.keys()) == ["cat", "dog"]
+    assert table["dog"].tolist() == [2.0, 2.0]     # as a dict would
+    assert table["cat"].dtype == np.float32
+    assert len(table) == 2 and table.vector_size == 2
+
+
+def test_lookup_api():
+    table = EmbeddingTable.from_vectors({"café": np.array([1.0, 2.0]), "b": np.array([3.0, 4.0])})
+    assert "café" in table and "zzz" not in table and "" not in table
+    assert table.get("zzz") is None
+    with pytest.raises(KeyError):
+        table["zzz"]
+
+
+def test_float16_table_embeds_like_the_dict():
+    vectors = {"a": np.array([1.0, 0.5]), "b": np.array([-1.0, 2.0])}
+    table = EmbeddingTable.from_vectors(vectors, dtype=np.float16)
+    assert table.matrix.dtype == np.float16
+    expected, found = embed(["a", "b", "c"], [vectors])
+    got, got_found = embed(["a", "b", "c"], [table])
+    assert np.allclose(expected, got, atol=1e-3)
+    assert found.tolist() == got_found.tolist() == [True, True, False]
+
+
+def test_save_and_memory_map(tmp_path):
+    base = tmp_path / "vecs"
+    EmbeddingTable.from_arrays(["x", "y"], [[1, 2], [3, 4]]).save(base)
+    assert EmbeddingTable.exists(base)
+    table = EmbeddingTable.load(base)
+    assert isinstance(table.matrix, np.memmap)
+    assert table["y"].tolist() == [3.0, 4.0]
+
+
+def test_is_fresh(tmp_path):
+    source = tmp_path / "glove.txt"
+    write_glove(source, [("x", [1, 2])])
+    assert not EmbeddingTable.is_fresh(source, source)
+    read_glove(source).save(source)
+    assert EmbeddingTable.is_fresh(source, source)
+    for f in EmbeddingTable.files(source):
+        age(f, 60)
+    assert not EmbeddingTable.is_fresh(source, source)
+
+
+def test_cached_glove_converts_once_and_again_when_source_changes(tmp_path):
+    source = tmp_path / "glove.txt"
+    write_glove(source, [("x", [1, 2]), ("y", [3, 4])])
+    first = cached_glove(str(source))
+    assert isinstance(first.matrix, np.memmap) and first["x"].tolist() == [1.0, 2.0]
+
+    write_glove(source, [("x", [5, 6])])
+    for f in EmbeddingTable.files(source):
+        age(f, 60)
+    second = cached_glove(str(source))
+    assert second["x"].tolist() == [5.0, 6.0] and "y" not in second
+
+
+def test_shared_table_reconverts_stale_copies(tmp_path):
+    source = tmp_path / "vectors.txt"
+    write_glove(source, [("x", [1, 2])])
+    loads = []
+
+    def loader(path):
+        loads.append(path)
+        return read_glove(path)
+
+    shared = tmp_path / "shared"
+    assert shared_table(str(source), loader, shared)["x"].tolist() == [1.0, 2.0]
+    shared_table(str(source), loader, shared)
+    assert len(loads) == 1
+
+    write_glove(source, [("x", [7, 8])])
+    for f in shared.iterdir():
+        age(f, 60)
+    assert shared_table(str(source), loader, shared)["x"].tolist() == [7.0, 8.0]
+    assert len(loads) == 2
+
+
+def test_shared_table_reuses_the_glove_cache(tmp_path):
+    source = tmp_path / "glove.txt"
+    write_glove(source, [("x", [1, 2])])
+    cached_glove(str(source))
+    table = shared_table(str(source), cached_glove, tmp_path / "shared")
+    assert table["x"].tolist() == [1.0, 2.0]
+    assert not (tmp_path / "shared").exists()
+
+
+def test_table_iterates_like_the_dict():
+    vectors = {"dog": np.array([1.0, 0.0]), "cat": np.array([0.0, 1.0])}
+    table = EmbeddingTable.from_vectors(vectors)
+    assert sorted(table) == sorted(list(table)) == sorted(vectors)
+    assert [w for w in table] == list(table.keys())
+    assert {w: v.tolist() for w, v in table.items()} == {w: v.tolist() for w, v in vectors.items()}
+    assert [v.tolist() for v in table.values()] == [table[w].tolist() for w in table]
+    assert dict(table.items()).keys() == vectors.keys()
+
+
+def test_w2v_cache_is_renamed_into_place(tmp_path):
+    from gensim.models import KeyedVectors
+
+    from codenames.game import Game
+
+    source = tmp_path / "vectors.bin"
+    kv = KeyedVectors(4)
+    kv.add_vectors(["a", "b"], np.arange(8, dtype=np.float32).reshape(2, 4))
+    kv.save_word2vec_format(str(source), binary=True)
+
+    Game.load_w2v(str(source))
+    assert not [f for f in os.listdir(tmp_path) if ".tmp" in f]
+    cached = Game.load_w2v(str(source))
+    assert cached["b"].tolist() == [4.0, 5.0, 6.0, 7.0]
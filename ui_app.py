@@ -35,13 +35,20 @@ ROLE_COLORS = {
 MARKER_WORDS = {"RED", "BLUE", "CIVILIAN", "NEUTRAL", "ASSASSIN"}
 
 STRATEGY_LABELS = ["Default", "Cautious", "Risky", "COT", "Self Refine", "Solo Performance"]
+CODEMASTER_STRATEGY_LABELS = STRATEGY_LABELS + ["Self Refine Parallel", "Planned"]
+GUESSER_STRATEGY_LABELS = STRATEGY_LABELS + ["Ranked", "Self Consistency"]
+HISTORY_OPTIONS = ["full", "pinned", "turns:2", "window:6"]
 STRATEGY_DIR = {
     "Default": "Default",
     "Cautious": "Cautious",
     "Risky": "Risky",
     "COT": "COT",
     "Self Refine": "SelfRefine",
+    "Self Refine Parallel": "SelfRefineParallel",
+    "Planned": "Planned",
     "Solo Performance": "SoloPerformance",
+    "Ranked": "Ranked",
+    "Self Consistency": "SelfConsistency",
 }
 
 
@@ -102,6 +109,8 @@ class EventLog:
     started_at: float = 0.0                        # wall-clock start
     run_id: str = ""                               # file name id
     strategy: str = ""
+    turn_stats: list = field(default_factory=list)  # per-turn LLM calls/tokens/latency
+    llm_stats: dict = field(default_factory=dict)   # per-game totals per agent
 
     def to_json(self) -> str:
         return json.dumps(asdict(self), ensure_ascii=False, indent=2)
@@ -170,6 +179,12 @@ class StreamObserver:
             }
         )
 
+    def on_turn_stats(self, stats):
+        self.log.turn_stats.append(stats)
+
+    def on_llm_stats(self, stats):
+        self.log.llm_stats = stats
+
     def on_end(self, final_score, did_win):
         # keep did_win as a proper boolean
         self.log.final_score = int(final_score)
@@ -400,8 +415,29 @@ with st.sidebar:
 
     st.caption(f"Backend: {'Mock' if mock_mode else provider}")
 
-    cm_strategy_label = st.selectbox("Codemaster strategy", STRATEGY_LABELS, index=0)
-    g_strategy_label = st.selectbox("Guesser strategy", STRATEGY_LABELS, index=0)
+    # Reuse stored replies for identical prompt sequences (e.g. re-running fixed boards)
+    use_cache = st.checkbox(
+        "Cache LLM replies",
+        value=os.getenv("GPT_CACHE") == "1",
+        help="Replays identical conversations from results/gpt_cache.sqlite instead of calling the API.",
+    )
+    if use_cache:
+        os.environ["GPT_CACHE"] = "1"
+    else:
+        os.environ.pop("GPT_CACHE", None)
+
+    # How much of the conversation is resent on every call (see gpt_history.py)
+    history_spec = st.selectbox(
+        "Conversation history",
+        HISTORY_OPTIONS,
+        index=0,
+        help="full = resend everything; pinned = system prompt + current turn; "
+             "turns:N = last N turns; window:N = last N messages.",
+    )
+    os.environ["GPT_HISTORY"] = history_spec
+
+    cm_strategy_label = st.selectbox("Codemaster strategy", CODEMASTER_STRATEGY_LABELS, index=0)
+    g_strategy_label = st.selectbox("Guesser strategy", GUESSER_STRATEGY_LABELS, index=0)
 
     # 10 fixed boards vs single board
     use_fixed_boards = st.checkbox(
@@ -557,3 +593,13 @@ else:
     )
     if log.run_id:
         st.caption(f"Run ID: {log.run_id}")
+
+    llm_stats = getattr(log, "llm_stats", None) or {}
+    for role in ("codemaster", "guesser"):
+        s = llm_stats.get(role)
+        if s:
+            st.caption(
+                f"{role.title()} LLM: {s['calls']} calls · "
+                f"{s['prompt_tokens']} prompt / {s['completion_tokens']} completion tokens · "
+                f"{s['latency_s']:.1f}s · {s['retries']} retries"
+            )